@@ -0,0 +1,5 @@
+"""Headless benchmarks of the editor.
+
+Run from the repository root with `python -m benchmarks`, see `--help` for the
+size of the synthetic graph and the baseline options.
+"""
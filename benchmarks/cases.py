@@ -0,0 +1,493 @@
+"""Benchmark cases of the editor.
+
+Each case builds its own window and synthetic graph, times a single operation
+and returns its duration in seconds. The memory cases return a number of bytes
+instead.
+"""
+from __future__ import annotations
+
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import attr
+import orodruin.commands
+from orodruin.core import Node, PortDirection, State
+from PySide2.QtCore import QEvent, QPoint, QPointF, QRectF, Qt
+from PySide2.QtGui import QImage, QMouseEvent, QPainter, QPainterPath
+from PySide2.QtWidgets import QApplication, QGraphicsView
+
+from orodruin_editor.core.tracing import do_command
+from orodruin_editor.models.node_list_model import NodeTable
+from orodruin_editor.models.node_search_index import NodeSearchIndex
+from orodruin_editor.ui.editor.graphics_items.graphics_connection import (
+    GraphicsConnection,
+)
+from orodruin_editor.ui.editor.graphics_items.graphics_node import GraphicsNode
+from orodruin_editor.ui.editor.graphics_items.graphics_socket import GraphicsSocket
+from orodruin_editor.ui.editor.paint_profiler import PaintProfiler
+from orodruin_editor.ui.window import OrodruinWindow
+
+from .synthetic_graph import populate_graph
+from .synthetic_library import library_entries
+
+
+@attr.s(frozen=True)
+class GraphConfig:
+    """Size of the synthetic graph the benchmarks run on."""
+
+    node_count: int = attr.ib(default=500)
+    ports_per_node: int = attr.ib(default=4)
+    connection_density: float = attr.ib(default=0.5)
+    nesting_depth: int = attr.ib(default=0)
+    seed: int = attr.ib(default=0)
+
+    # Number of frames of the pan and zoom sweeps.
+    sweep_steps: int = attr.ib(default=40)
+
+    # Number of entries of the synthetic node library.
+    library_size: int = attr.ib(default=100000)
+
+    # Number of nodes the delete cases select, in a graph at least twice as big.
+    delete_count: int = attr.ib(default=2000)
+
+
+# Library indexes of the benchmark windows, kept out of the user cache.
+_library_index_directory = tempfile.TemporaryDirectory(prefix="orodruin-benchmarks-")
+
+
+def create_window(app: QApplication) -> OrodruinWindow:
+    # Every window starts from an empty index of its own.
+    library_index_path = (
+        Path(tempfile.mkdtemp(dir=_library_index_directory.name)) / "library_index.json"
+    )
+    window = OrodruinWindow(State(), library_index_path=library_index_path)
+    window.show()
+    app.processEvents()
+    return window
+
+
+def load_graph(window: OrodruinWindow, config: GraphConfig) -> List[Node]:
+    graphics_state = window.graphics_state()
+    with graphics_state.batch():
+        return populate_graph(
+            graphics_state,
+            config.node_count,
+            config.ports_per_node,
+            config.connection_density,
+            config.seed,
+            config.nesting_depth,
+        )
+
+
+def loaded_window(app: QApplication, config: GraphConfig) -> OrodruinWindow:
+    window = create_window(app)
+    load_graph(window, config)
+    app.processEvents()
+    return window
+
+
+def fit_items_in_view(app: QApplication, window: OrodruinWindow) -> QRectF:
+    """Fit the content of the active graph in the view and return its rect."""
+    view = window.graphics_state().view()
+    items_rect = view.scene().itemsBoundingRect()
+    view.fitInView(items_rect, Qt.KeepAspectRatio)
+    app.processEvents()
+    return items_rect
+
+
+def delete_window(app: QApplication, config: GraphConfig) -> OrodruinWindow:
+    """Return a loaded window with the nodes of the delete cases selected."""
+    node_count = max(config.node_count, config.delete_count * 2)
+    window = loaded_window(app, attr.evolve(config, node_count=node_count))
+    select_nodes(window, config.delete_count / node_count)
+    return window
+
+
+def select_nodes(window: OrodruinWindow, fraction: float = 1.0) -> None:
+    """Select the given fraction of the nodes of the active graph."""
+    scene = window.graphics_state().view().scene()
+    graphics_nodes = [item for item in scene.items() if isinstance(item, GraphicsNode)]
+    for graphics_node in graphics_nodes[: int(len(graphics_nodes) * fraction)]:
+        graphics_node.setSelected(True)
+
+
+def bench_window_construction(app: QApplication, config: GraphConfig) -> float:
+    start = time.perf_counter()
+    window = create_window(app)
+    duration = time.perf_counter() - start
+    window.close()
+    return duration
+
+
+def bench_graph_load(app: QApplication, config: GraphConfig) -> float:
+    window = create_window(app)
+    start = time.perf_counter()
+    load_graph(window, config)
+    app.processEvents()
+    duration = time.perf_counter() - start
+    window.close()
+    return duration
+
+
+def bench_graph_load_unbatched(app: QApplication, config: GraphConfig) -> float:
+    """Time loading the graph with every scene operation applied immediately."""
+    window = create_window(app)
+    graphics_state = window.graphics_state()
+    start = time.perf_counter()
+    populate_graph(
+        graphics_state,
+        config.node_count,
+        config.ports_per_node,
+        config.connection_density,
+        config.seed,
+        config.nesting_depth,
+    )
+    app.processEvents()
+    duration = time.perf_counter() - start
+    window.close()
+    return duration
+
+
+def bench_port_registration(app: QApplication, config: GraphConfig) -> float:
+    """Time the registration of a single port, averaged over unconnected nodes.
+
+    Run with growing --ports to check that it stays constant.
+    """
+    window = create_window(app)
+    graphics_state = window.graphics_state()
+    start = time.perf_counter()
+    populate_graph(
+        graphics_state,
+        config.node_count,
+        ports_per_node=config.ports_per_node,
+        connection_density=0,
+        seed=config.seed,
+    )
+    duration = time.perf_counter() - start
+    window.close()
+    # Each node has ports_per_node input and ports_per_node output ports.
+    return duration / max(1, config.node_count * config.ports_per_node * 2)
+
+
+def bench_node_creation(app: QApplication, config: GraphConfig) -> float:
+    """Time the creation of bare nodes, without ports nor connections."""
+    window = create_window(app)
+    graphics_state = window.graphics_state()
+    start = time.perf_counter()
+    with graphics_state.batch():
+        populate_graph(graphics_state, config.node_count, ports_per_node=0)
+    app.processEvents()
+    duration = time.perf_counter() - start
+    window.close()
+    return duration
+
+
+def bench_render(app: QApplication, config: GraphConfig) -> float:
+    window = loaded_window(app, config)
+    fit_items_in_view(app, window)
+    view = window.graphics_state().view()
+
+    image = QImage(view.viewport().size(), QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    start = time.perf_counter()
+    view.render(painter)
+    duration = time.perf_counter() - start
+    painter.end()
+
+    window.close()
+    return duration
+
+
+def bench_node_paint(app: QApplication, config: GraphConfig) -> float:
+    """Time a single GraphicsNode.paint at full detail, averaged over a render."""
+    window = loaded_window(app, config)
+    view = window.graphics_state().view()
+    view.resetTransform()
+    view.centerOn(view.scene().itemsBoundingRect().center())
+    app.processEvents()
+
+    profiler = PaintProfiler()
+    image = QImage(view.viewport().size(), QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    profiler.install()
+    view.render(painter)
+    profiler.uninstall()
+    painter.end()
+
+    window.close()
+    label = "GraphicsNode.paint"
+    return profiler.paint_times().get(label, 0.0) / max(
+        1, profiler.paint_counts().get(label, 0)
+    )
+
+
+def bench_pan_sweep(app: QApplication, config: GraphConfig) -> float:
+    window = loaded_window(app, config)
+    view = window.graphics_state().view()
+    items_rect = view.scene().itemsBoundingRect()
+
+    start = time.perf_counter()
+    for step in range(config.sweep_steps):
+        ratio = step / max(1, config.sweep_steps - 1)
+        x = items_rect.left() + items_rect.width() * ratio
+        view.centerOn(QPointF(x, items_rect.center().y()))
+        app.processEvents()
+    duration = time.perf_counter() - start
+
+    window.close()
+    return duration
+
+
+def bench_zoom_sweep(app: QApplication, config: GraphConfig) -> float:
+    window = loaded_window(app, config)
+    view = window.graphics_state().view()
+    view.centerOn(view.scene().itemsBoundingRect().center())
+    app.processEvents()
+
+    # Zoom out then back in, ending at the starting zoom.
+    half_steps = config.sweep_steps // 2
+    factors = [0.8] * half_steps + [1.25] * half_steps
+
+    start = time.perf_counter()
+    for factor in factors:
+        view.scale(factor, factor)
+        app.processEvents()
+    duration = time.perf_counter() - start
+
+    window.close()
+    return duration
+
+
+def bench_rubber_band_selection(app: QApplication, config: GraphConfig) -> float:
+    window = loaded_window(app, config)
+    items_rect = fit_items_in_view(app, window)
+    view = window.graphics_state().view()
+
+    # Same call the view makes when the rubber band is released,
+    # over the top left quarter of the graph.
+    selection_area = QPainterPath()
+    selection_area.addRect(
+        QRectF(
+            items_rect.left(),
+            items_rect.top(),
+            items_rect.width() / 2,
+            items_rect.height() / 2,
+        )
+    )
+    start = time.perf_counter()
+    view.scene().setSelectionArea(
+        selection_area,
+        Qt.ReplaceSelection,
+        Qt.IntersectsItemShape,
+        view.viewportTransform(),
+    )
+    app.processEvents()
+    duration = time.perf_counter() - start
+
+    window.close()
+    return duration
+
+
+def bench_connection_drag(app: QApplication, config: GraphConfig) -> float:
+    """Time dragging a new connection from an output socket across the view."""
+    window = loaded_window(app, config)
+    view = window.graphics_state().view()
+    view.resetTransform()
+    view.centerOn(view.scene().itemsBoundingRect().center())
+    app.processEvents()
+
+    viewport = view.viewport()
+    source_socket = next(
+        item
+        for item in view.items(viewport.rect())
+        if isinstance(item, GraphicsSocket) and item.direction() is PortDirection.output
+    )
+    start_position = view.mapFromScene(
+        source_socket.graphics_port().scene_socket_position()
+    )
+
+    def send_mouse_event(event_type: QEvent.Type, position: QPoint) -> None:
+        is_release = event_type == QEvent.MouseButtonRelease
+        buttons = Qt.NoButton if is_release else Qt.LeftButton
+        event = QMouseEvent(
+            event_type, QPointF(position), Qt.LeftButton, buttons, Qt.NoModifier
+        )
+        QApplication.sendEvent(viewport, event)
+
+    send_mouse_event(QEvent.MouseButtonPress, start_position)
+    start = time.perf_counter()
+    for step in range(config.sweep_steps * 5):
+        ratio = step / max(1, config.sweep_steps * 5 - 1)
+        position = QPoint(
+            round(viewport.width() * ratio), round(viewport.height() * ratio)
+        )
+        send_mouse_event(QEvent.MouseMove, position)
+        app.processEvents()
+    duration = time.perf_counter() - start
+    send_mouse_event(QEvent.MouseButtonRelease, position)
+
+    window.close()
+    return duration
+
+
+def node_move_case(
+    mode: QGraphicsView.ViewportUpdateMode,
+) -> Callable[[QApplication, GraphConfig], float]:
+    """Return a case timing the frame of a node move in a viewport update mode."""
+
+    def bench_node_move(app: QApplication, config: GraphConfig) -> float:
+        window = loaded_window(app, config)
+        graphics_state = window.graphics_state()
+        view = graphics_state.view()
+        view.set_viewport_update_mode(mode)
+        view.resetTransform()
+        view.centerOn(view.scene().itemsBoundingRect().center())
+        app.processEvents()
+
+        graphics_node = next(
+            item
+            for item in view.items(view.viewport().rect())
+            if isinstance(item, GraphicsNode)
+        )
+        frame_times = []
+        for step in range(config.sweep_steps):
+            offset = 25 if step % 2 == 0 else -25
+            start = time.perf_counter()
+            graphics_node.moveBy(offset, 0)
+            app.processEvents()
+            frame_times.append(time.perf_counter() - start)
+
+        window.close()
+        return statistics.median(frame_times)
+
+    return bench_node_move
+
+
+def bench_delete(app: QApplication, config: GraphConfig) -> float:
+    """Time the one pass deletion of the selected nodes, as the delete key does."""
+    window = delete_window(app, config)
+    view = window.graphics_state().view()
+
+    start = time.perf_counter()
+    view.on_del_released(None)
+    app.processEvents()
+    duration = time.perf_counter() - start
+
+    window.close()
+    return duration
+
+
+def bench_delete_per_item(app: QApplication, config: GraphConfig) -> float:
+    """Time deleting the selected nodes one command and item removal at a time."""
+    window = delete_window(app, config)
+    graphics_state = window.graphics_state()
+    selected_items = graphics_state.view().scene().selectedItems()
+
+    start = time.perf_counter()
+    for item in selected_items:
+        if isinstance(item, GraphicsConnection):
+            do_command(
+                orodruin.commands.DisconnectPorts(
+                    graphics_state.state(),
+                    graphics_state.active_graph().uuid(),
+                    item.source_graphics_port().uuid(),
+                    item.target_graphics_port().uuid(),
+                )
+            )
+    for item in selected_items:
+        if isinstance(item, GraphicsNode):
+            do_command(
+                orodruin.commands.DeleteNode(graphics_state.state(), item.uuid())
+            )
+    app.processEvents()
+    duration = time.perf_counter() - start
+
+    window.close()
+    return duration
+
+
+def bench_group(app: QApplication, config: GraphConfig) -> float:
+    window = loaded_window(app, config)
+    select_nodes(window, 0.5)
+    view = window.graphics_state().view()
+
+    start = time.perf_counter()
+    view.on_control_g_pressed(None)
+    app.processEvents()
+    duration = time.perf_counter() - start
+
+    window.close()
+    return duration
+
+
+def bench_node_search(app: QApplication, config: GraphConfig) -> float:
+    """Time a fuzzy search of the node library, averaged over a few queries."""
+    search_index = NodeSearchIndex()
+    search_index.add(
+        (path.stem, library_name)
+        for path, library_name in library_entries(config.library_size, config.seed)
+    )
+    queries = ["b", "bl", "blend", "blnd matr", "matrix_comp", "twst", "spline ik"]
+
+    start = time.perf_counter()
+    for query in queries:
+        search_index.search(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def bench_node_list_memory(app: QApplication, config: GraphConfig) -> float:
+    """Measure the memory the node list model stores the node library in."""
+    entries = library_entries(config.library_size, config.seed)
+
+    tracemalloc.start()
+    try:
+        nodes = NodeTable()
+        nodes.append(entries)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size
+
+
+CASES: Dict[str, Callable[[QApplication, GraphConfig], float]] = {
+    "window_construction": bench_window_construction,
+    "graph_load": bench_graph_load,
+    "graph_load_unbatched": bench_graph_load_unbatched,
+    "port_registration": bench_port_registration,
+    "node_creation": bench_node_creation,
+    "render": bench_render,
+    "node_paint": bench_node_paint,
+    "pan_sweep": bench_pan_sweep,
+    "zoom_sweep": bench_zoom_sweep,
+    "rubber_band_selection": bench_rubber_band_selection,
+    "connection_drag": bench_connection_drag,
+    "node_move_full": node_move_case(QGraphicsView.FullViewportUpdate),
+    "node_move_minimal": node_move_case(QGraphicsView.MinimalViewportUpdate),
+    "node_move_smart": node_move_case(QGraphicsView.SmartViewportUpdate),
+    "node_move_bounding_rect": node_move_case(QGraphicsView.BoundingRectViewportUpdate),
+    "delete": bench_delete,
+    "delete_per_item": bench_delete_per_item,
+    "group": bench_group,
+    "node_search": bench_node_search,
+    "node_list_memory": bench_node_list_memory,
+}
+
+# Cases measuring bytes instead of seconds.
+MEMORY_CASES = {"node_list_memory"}
+
+__all__ = [
+    "CASES",
+    "GraphConfig",
+    "MEMORY_CASES",
+    "create_window",
+    "delete_window",
+    "fit_items_in_view",
+    "load_graph",
+    "loaded_window",
+    "node_move_case",
+    "select_nodes",
+]
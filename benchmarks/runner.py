@@ -0,0 +1,185 @@
+"""Run the benchmark cases and compare them against a stored baseline."""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import attr
+
+if TYPE_CHECKING:
+    from .cases import GraphConfig
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+# Baseline of the reference machine, stored with the repository.
+REFERENCE_BASELINE_PATH = BASELINES_DIR / "reference.json"
+
+
+def machine_baseline_path() -> Path:
+    """Baselines are per machine, timings of different machines don't compare."""
+    return BASELINES_DIR / f"{platform.node() or 'default'}.json"
+
+
+def default_baseline_path() -> Path:
+    """Return the baseline to compare against, the reference one if none is saved."""
+    path = machine_baseline_path()
+    if path.exists() or not REFERENCE_BASELINE_PATH.exists():
+        return path
+    return REFERENCE_BASELINE_PATH
+
+
+def run_cases(
+    config: GraphConfig, names: List[str], repeat: int
+) -> Dict[str, Dict[str, Any]]:
+    # Qt is only imported once the platform plugin has been chosen.
+    from PySide2.QtWidgets import QApplication
+
+    from .cases import CASES, MEMORY_CASES
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    results = {}
+    for name in names:
+        runs = [CASES[name](app, config) for _ in range(repeat)]
+        results[name] = {
+            "median": statistics.median(runs),
+            "min": min(runs),
+            "runs": runs,
+        }
+        if name in MEMORY_CASES:
+            print(f"{name:<25}{results[name]['median'] / 1e6:>12.3f} MB")
+        else:
+            print(f"{name:<25}{results[name]['median'] * 1000:>12.3f} ms")
+    return results
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return the names of the cases slower or larger than the baseline."""
+    if report["config"] != baseline["config"]:
+        print("The baseline was recorded with another graph config, skipping.")
+        return []
+    if not baseline["results"]:
+        print("The baseline has no results, record them with --save-baseline.")
+        return []
+
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        ratio = result["median"] / reference["median"]
+        status = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"{name:<25}{ratio:>11.2f}x {status}")
+        if status != "ok":
+            regressions.append(name)
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the editor on synthetic graphs, without a display.",
+    )
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--ports", type=int, default=4, help="Ports per direction.")
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--depth", type=int, default=0, help="Nesting depth.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--library-size", type=int, default=100000, help="Node library entries."
+    )
+    parser.add_argument(
+        "--delete-count", type=int, default=2000, help="Nodes the delete cases delete."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--case", action="append", dest="cases", help="Only run the given case."
+    )
+    parser.add_argument("--output", type=Path, help="Write the results to a file.")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Defaults to the baseline of this machine, or the reference one.",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Slowdown ratio over the baseline reported as a regression.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from .cases import CASES, GraphConfig
+
+    config = GraphConfig(
+        node_count=args.nodes,
+        ports_per_node=args.ports,
+        connection_density=args.density,
+        nesting_depth=args.depth,
+        seed=args.seed,
+        library_size=args.library_size,
+        delete_count=args.delete_count,
+    )
+    names = args.cases or list(CASES)
+    unknown_names = sorted(set(names) - set(CASES))
+    if unknown_names:
+        print(f"Unknown cases: {', '.join(unknown_names)}")
+        return 2
+
+    report = {
+        "config": attr.asdict(config),
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": run_cases(config, names, args.repeat),
+    }
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=4))
+
+    if args.save_baseline:
+        # The reference baseline is only overwritten when given explicitly.
+        baseline_path = args.baseline or machine_baseline_path()
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=4))
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    baseline_path = args.baseline or default_baseline_path()
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}, run with --save-baseline first.")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(report, baseline, args.tolerance)
+    return 1 if regressions else 0
+
+
+__all__ = [
+    "REFERENCE_BASELINE_PATH",
+    "compare",
+    "default_baseline_path",
+    "machine_baseline_path",
+    "main",
+    "run_cases",
+]
@@ -0,0 +1,84 @@
+"""Helpers to fill an Orodruin state with a synthetic graph for benchmarks."""
+import random
+from typing import List, Optional
+from uuid import UUID
+
+import orodruin.commands
+from orodruin.core import Node, PortDirection, PortTypes, State
+from PySide2.QtCore import QPointF
+
+from orodruin_editor.ui.editor.graphics_state import GraphicsState
+
+
+def populate_graph(
+    graphics_state: GraphicsState,
+    node_count: int,
+    ports_per_node: int = 4,
+    connection_density: float = 0.5,
+    seed: int = 0,
+    nesting_depth: int = 0,
+    graph_id: Optional[UUID] = None,
+) -> List[Node]:
+    """Create nodes, ports and connections in a graph, the active one by default.
+
+    Nodes are laid out on a grid. Each output port of a node has a
+    `connection_density` chance to be connected to the matching input port
+    of a random node further down the list.
+
+    With a `nesting_depth`, the graph of the first node is filled the same
+    way, recursively, and only the nodes of the top level graph are returned.
+    """
+    rng = random.Random(seed)
+    state: State = graphics_state.state()
+    if graph_id is None:
+        graph_id = graphics_state.active_graph().uuid()
+    port_types = [port_type.value for port_type in PortTypes]
+
+    nodes = []
+    ports = {direction: [] for direction in PortDirection}
+    columns = max(1, int(node_count**0.5))
+    for index in range(node_count):
+        node = orodruin.commands.CreateNode(state, graph_id, f"node{index}").do()
+        for direction in PortDirection:
+            node_ports = []
+            for port_index in range(ports_per_node):
+                port = orodruin.commands.CreatePort(
+                    state,
+                    node.uuid(),
+                    f"{direction.value}{port_index}",
+                    direction,
+                    port_types[port_index % len(port_types)],
+                ).do()
+                node_ports.append(port)
+            ports[direction].append(node_ports)
+
+        graphics_state.set_node_position(
+            node, QPointF((index % columns) * 250, (index // columns) * 300)
+        )
+        nodes.append(node)
+
+    for index in range(node_count - 1):
+        for port_index in range(ports_per_node):
+            if rng.random() >= connection_density:
+                continue
+            target_index = rng.randint(index + 1, node_count - 1)
+            orodruin.commands.ConnectPorts(
+                state,
+                graph_id,
+                ports[PortDirection.output][index][port_index].uuid(),
+                ports[PortDirection.input][target_index][port_index].uuid(),
+                force=True,
+            ).do()
+
+    if nesting_depth > 0 and nodes:
+        populate_graph(
+            graphics_state,
+            node_count,
+            ports_per_node,
+            connection_density,
+            seed + 1,
+            nesting_depth - 1,
+            nodes[0].graph().uuid(),
+        )
+
+    return nodes
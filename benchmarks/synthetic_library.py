@@ -0,0 +1,61 @@
+"""Helpers to generate the entries of a synthetic node library for benchmarks."""
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+# Words node names are made of, like "matrix_blend" or "spline_ik".
+WORDS = [
+    "add",
+    "aim",
+    "blend",
+    "clamp",
+    "compose",
+    "constraint",
+    "curve",
+    "decompose",
+    "divide",
+    "fk",
+    "ik",
+    "joint",
+    "matrix",
+    "multiply",
+    "noise",
+    "offset",
+    "parent",
+    "point",
+    "quaternion",
+    "remap",
+    "ribbon",
+    "spline",
+    "subtract",
+    "twist",
+    "vector",
+]
+
+LIBRARY_NAMES = ["core", "math", "rigging", "user"]
+
+
+def library_entries(count: int, seed: int = 0) -> List[Tuple[Path, str]]:
+    """Return node file paths and library names of a synthetic library.
+
+    Besides the common words, names draw from a vocabulary of random words
+    so the names are as varied as in a large real library.
+    """
+    rng = random.Random(seed)
+    vocabulary = WORDS + [
+        "".join(rng.choice("abcdefghijklmnoprstuvw") for _ in range(rng.randint(3, 9)))
+        for _ in range(max(1, count // 30))
+    ]
+    entries = []
+    for _ in range(count):
+        name = "_".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3)))
+        library_name = rng.choice(LIBRARY_NAMES)
+        entries.append((Path(library_name, "orodruin", f"{name}.json"), library_name))
+    return entries
+
+
+__all__ = [
+    "LIBRARY_NAMES",
+    "WORDS",
+    "library_entries",
+]
@@ -1,7 +1,9 @@
 from .deserializer import EditorDeserializer
 from .serializer import EditorSerializer
+from .tracing import Tracer
 
 __all__ = [
     "EditorDeserializer",
     "EditorSerializer",
+    "Tracer",
 ]
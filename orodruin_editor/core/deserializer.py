@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Any, Dict
 
 import attr
 from orodruin.core import Deserializer
+from PySide2.QtCore import QPointF
 
 if TYPE_CHECKING:
     from orodruin.core import Connection, Graph, Node, Port
@@ -24,8 +25,7 @@ class EditorDeserializer(Deserializer):
         pos = data.get("editor", {}).get("position", None)
 
         if pos is not None:
-            graphics_node = self.graphics_state.get_graphics_node(node)
-            graphics_node.setPos(*pos)
+            self.graphics_state.set_node_position(node, QPointF(*pos))
 
     def deserialize_port(self, data: Dict[str, Any], port: Port) -> None:
         return None
@@ -30,10 +30,10 @@ class EditorSerializer(Serializer):
         serialization_type: SerializationType,
     ) -> Dict[str, Any]:
         if serialization_type is SerializationType.instance:
-            graphics_node = self.graphics_state.get_graphics_node(node)
+            position = self.graphics_state.node_position(node)
             data = {
                 "editor": {
-                    "position": [graphics_node.pos().x(), graphics_node.pos().y()],
+                    "position": [position.x(), position.y()],
                 },
             }
         else:
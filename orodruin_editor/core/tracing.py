@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+import attr
+
+Function = TypeVar("Function", bound=Callable[..., Any])
+
+# Tracing is opt-in, spans are only recorded while a tracer is started.
+_active_tracer: Optional[Tracer] = None
+
+
+@attr.s
+class Tracer:
+    """Record nested spans of editor work as Chrome trace events.
+
+    The exported file can be opened in chrome://tracing or Perfetto.
+    """
+
+    _events: List[Dict[str, Any]] = attr.ib(init=False, factory=list)
+    _origin: float = attr.ib(init=False, factory=time.perf_counter)
+
+    def start(self) -> None:
+        """Record the spans of the editor into this tracer."""
+        global _active_tracer  # pylint: disable=global-statement
+        _active_tracer = self
+
+    def stop(self) -> None:
+        global _active_tracer  # pylint: disable=global-statement
+        if _active_tracer is self:
+            _active_tracer = None
+
+    def is_started(self) -> bool:
+        return _active_tracer is self
+
+    def clear(self) -> None:
+        self._events.clear()
+        self._origin = time.perf_counter()
+
+    def events(self) -> List[Dict[str, Any]]:
+        return list(self._events)
+
+    @contextmanager
+    def span(
+        self, name: str, category: str, args: Optional[Dict[str, Any]] = None
+    ) -> Iterator[None]:
+        """Record the duration of the wrapped block.
+
+        Spans are nested by their timestamps, a span recorded within another
+        one is displayed as its child.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            if args:
+                event["args"] = args
+            self._events.append(event)
+
+    def export(self, path: Path) -> None:
+        """Write the recorded spans in the Chrome trace event format."""
+        with open(path, "w") as handle:
+            json.dump(
+                {"traceEvents": self._events, "displayTimeUnit": "ms"},
+                handle,
+            )
+
+
+def active_tracer() -> Optional[Tracer]:
+    return _active_tracer
+
+
+@contextmanager
+def trace_span(
+    name: str, category: str, args: Optional[Dict[str, Any]] = None
+) -> Iterator[None]:
+    """Record a span into the started tracer, if any."""
+    tracer = _active_tracer
+    if tracer is None:
+        yield
+        return
+    with tracer.span(name, category, args):
+        yield
+
+
+def traced(category: str) -> Callable[[Function], Function]:
+    """Record a span named after the decorated function for each of its calls."""
+
+    def decorator(function: Function) -> Function:
+        name = function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _active_tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            with tracer.span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def do_command(command: Any) -> Any:
+    """Run an Orodruin command within a span named after it."""
+    with trace_span(type(command).__name__, "command"):
+        return command.do()
+
+
+__all__ = [
+    "Tracer",
+    "active_tracer",
+    "do_command",
+    "trace_span",
+    "traced",
+]
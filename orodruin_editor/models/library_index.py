@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import attr
+from PySide2.QtCore import QStandardPaths
+
+logger = logging.getLogger(__name__)
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return -1.0
+
+
+@attr.s
+class LibraryIndex:
+    """On-disk index of the node files of the libraries.
+
+    The mtimes of the root and node directories of the libraries tell which
+    libraries changed since the index was saved, only those need to be scanned
+    again. The list only shows node paths, editing a node file doesn't change
+    its entry so node files have no mtime.
+    """
+
+    _path: Path = attr.ib()
+    _version: int = attr.ib(init=False, default=2)
+
+    # Node file path -> library name.
+    _nodes: Dict[str, str] = attr.ib(init=False, factory=dict)
+    # Library root or node directory -> library name, mtime.
+    _directories: Dict[str, Tuple[str, float]] = attr.ib(init=False, factory=dict)
+
+    @staticmethod
+    def default_path() -> Path:
+        cache_location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+        return Path(cache_location) / "library_index.json"
+
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> bool:
+        """Load the index from disk, return whether it could be loaded."""
+        try:
+            with self._path.open() as handle:
+                data = json.load(handle)
+        except (OSError, ValueError) as e:
+            logger.debug("Could not load the library index %s: %s", self._path, e)
+            return False
+
+        try:
+            if data.get("version") != self._version:
+                return False
+            nodes = {path: library_name for path, library_name in data["nodes"]}
+            directories = {
+                path: (library_name, mtime)
+                for path, library_name, mtime in data["directories"]
+            }
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.debug("Invalid library index %s: %s", self._path, e)
+            return False
+
+        self._nodes = nodes
+        self._directories = directories
+        logger.debug("Loaded %s nodes from %s.", len(self._nodes), self._path)
+        return True
+
+    def save(self) -> None:
+        data = {
+            "version": self._version,
+            "nodes": list(self._nodes.items()),
+            "directories": [
+                (path, library_name, mtime)
+                for path, (library_name, mtime) in self._directories.items()
+            ],
+        }
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("w") as handle:
+                json.dump(data, handle)
+        except OSError as e:
+            logger.error("Could not save the library index %s: %s", self._path, e)
+
+    def nodes(self) -> List[Tuple[Path, str]]:
+        """Return the path and library name of every indexed node file."""
+        return [
+            (Path(path), library_name) for path, library_name in self._nodes.items()
+        ]
+
+    def directories(self) -> List[str]:
+        return list(self._directories)
+
+    def directory_library(self, directory: str) -> Optional[str]:
+        """Return the name of the library holding the given directory."""
+        entry = self._directories.get(directory)
+        return entry[0] if entry else None
+
+    def library_names(self) -> Set[str]:
+        return {library_name for library_name, _ in self._directories.values()}
+
+    def stale_libraries(self) -> Set[str]:
+        """Return the libraries with a directory modified since it was indexed."""
+        return {
+            library_name
+            for path, (library_name, mtime) in self._directories.items()
+            if _mtime(path) != mtime
+        }
+
+    def remove_library(self, library_name: str) -> List[Path]:
+        """Forget a library, return the paths of its node files."""
+        return self.update_library(library_name, [])[1]
+
+    def update_library(
+        self,
+        library_name: str,
+        node_paths: Iterable[Path],
+        directories: Iterable[str] = (),
+    ) -> Tuple[List[Path], List[Path]]:
+        """Replace the node files and directories of a library.
+
+        The directories holding the node files are always recorded, on top of
+        the given ones. Return the added and removed node paths.
+        """
+        previous_paths = {
+            path
+            for path, node_library_name in self._nodes.items()
+            if node_library_name == library_name
+        }
+        paths = {str(node_path): node_path for node_path in node_paths}
+
+        removed = [Path(path) for path in previous_paths - paths.keys()]
+        added = [
+            node_path for path, node_path in paths.items() if path not in previous_paths
+        ]
+
+        for path in previous_paths - paths.keys():
+            del self._nodes[path]
+        for path in paths:
+            self._nodes[path] = library_name
+
+        for path in [
+            path
+            for path, (directory_library_name, _) in self._directories.items()
+            if directory_library_name == library_name
+        ]:
+            del self._directories[path]
+        for path in {str(Path(path).parent) for path in paths}.union(directories):
+            self._directories[path] = (library_name, _mtime(path))
+
+        return added, removed
+
+    def size(self) -> int:
+        return len(self._nodes)
+
+
+__all__ = ["LibraryIndex"]
@@ -0,0 +1,84 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from orodruin.core import LibraryManager
+from PySide2.QtCore import QObject, QThread, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class LibraryScanner(QThread):
+    """Worker thread listing the orodruin nodes of all the registered libraries.
+
+    The nodes found are sent in chunks so the model can insert them while the
+    scan goes on. The directories of each library are listed too, so new node
+    directories can be watched. Call requestInterruption to cancel the scan.
+    """
+
+    # List of (path, library name) tuples.
+    nodes_found = Signal(object)
+    # Number of libraries scanned, number of libraries.
+    progress = Signal(int, int)
+
+    def __init__(
+        self,
+        library_names: Optional[Iterable[str]] = None,
+        chunk_size: int = 500,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent=parent)
+        self._library_names = set(library_names) if library_names else None
+        self._chunk_size = chunk_size
+        self._scanned_libraries: List[str] = []
+        self._library_directories: Dict[str, List[str]] = {}
+
+    def scanned_libraries(self) -> List[str]:
+        """Return the names of the libraries fully scanned."""
+        return self._scanned_libraries
+
+    def library_directories(self, library_name: str) -> List[str]:
+        """Return the root and node directories of a scanned library."""
+        return self._library_directories.get(library_name, [])
+
+    def _list_directories(self, library_path: Path) -> Optional[List[str]]:
+        directories = [str(library_path)]
+        for directory, _, _ in os.walk(library_path / "orodruin"):
+            if self.isInterruptionRequested():
+                return None
+            directories.append(directory)
+        return directories
+
+    def run(self) -> None:
+        libraries = [
+            library
+            for library in LibraryManager.libraries()
+            if self._library_names is None or library.name() in self._library_names
+        ]
+        self.progress.emit(0, len(libraries))
+
+        chunk: List[Tuple[Path, str]] = []
+        for library_index, library in enumerate(libraries):
+            library_name = library.name()
+            directories = self._list_directories(library.path())
+            if directories is None:
+                logger.debug("Cancelled the library scan.")
+                return
+            self._library_directories[library_name] = directories
+            for node_path in library.nodes("orodruin"):
+                if self.isInterruptionRequested():
+                    logger.debug("Cancelled the library scan.")
+                    return
+                chunk.append((node_path, library_name))
+                if len(chunk) >= self._chunk_size:
+                    self.nodes_found.emit(chunk)
+                    chunk = []
+            self._scanned_libraries.append(library_name)
+            self.progress.emit(library_index + 1, len(libraries))
+
+        if chunk:
+            self.nodes_found.emit(chunk)
+
+
+__all__ = ["LibraryScanner"]
@@ -1,9 +1,26 @@
+import logging
+import os
+import time
+from array import array
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import attr
 from orodruin.core import LibraryManager
-from PySide2.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+from PySide2.QtCore import (
+    QAbstractListModel,
+    QFileSystemWatcher,
+    QModelIndex,
+    QObject,
+    Qt,
+    QTimer,
+    Signal,
+)
+
+from .library_index import LibraryIndex
+from .library_scanner import LibraryScanner
+
+logger = logging.getLogger(__name__)
 
 
 @attr.s
@@ -12,41 +29,413 @@ class NodeItem:
     library_name: str = attr.ib()
 
 
+@attr.s
+class NodeTable:
+    """Compact storage of the nodes of the node list model, one array per column.
+
+    Directories and library names are stored once and referenced by id. The
+    file names of all the nodes are joined in a single string, each row keeps
+    the offset of its file name and the length of its stem, the display name.
+    Strings and paths are only built when a row is read.
+    """
+
+    _directory_ids: array = attr.ib(init=False, factory=lambda: array("I"))
+    _library_ids: array = attr.ib(init=False, factory=lambda: array("I"))
+    _file_names: str = attr.ib(init=False, default="")
+    # One more offset than rows, the end of the last file name.
+    _file_name_offsets: array = attr.ib(init=False, factory=lambda: array("I", [0]))
+    _stem_lengths: array = attr.ib(init=False, factory=lambda: array("I"))
+
+    _directories: List[str] = attr.ib(init=False, factory=list)
+    _directory_ids_by_path: Dict[str, int] = attr.ib(init=False, factory=dict)
+    _library_names: List[str] = attr.ib(init=False, factory=list)
+    _library_ids_by_name: Dict[str, int] = attr.ib(init=False, factory=dict)
+
+    def size(self) -> int:
+        return len(self._library_ids)
+
+    def clear(self) -> None:
+        self._directory_ids = array("I")
+        self._library_ids = array("I")
+        self._file_names = ""
+        self._file_name_offsets = array("I", [0])
+        self._stem_lengths = array("I")
+
+    def append(self, nodes: Iterable[Tuple[Path, str]]) -> None:
+        """Add nodes of path, library name after the existing ones."""
+        file_names = []
+        offset = self._file_name_offsets[-1]
+        for path, library_name in nodes:
+            path = Path(path)
+            directory = str(path.parent)
+            directory_id = self._directory_ids_by_path.get(directory)
+            if directory_id is None:
+                directory_id = len(self._directories)
+                self._directories.append(directory)
+                self._directory_ids_by_path[directory] = directory_id
+
+            library_id = self._library_ids_by_name.get(library_name)
+            if library_id is None:
+                library_id = len(self._library_names)
+                self._library_names.append(library_name)
+                self._library_ids_by_name[library_name] = library_id
+
+            offset += len(path.name)
+            file_names.append(path.name)
+            self._file_name_offsets.append(offset)
+            self._stem_lengths.append(len(path.stem))
+            self._directory_ids.append(directory_id)
+            self._library_ids.append(library_id)
+        self._file_names += "".join(file_names)
+
+    def delete(self, first: int, last: int) -> None:
+        """Delete the nodes from the first to the last row, included."""
+        offsets = self._file_name_offsets
+        start = offsets[first]
+        end = offsets[last + 1]
+        self._file_names = self._file_names[:start] + self._file_names[end:]
+        length = end - start
+        offsets[first:] = array(
+            "I", (offset - length for offset in offsets[last + 1 :])
+        )
+        del self._stem_lengths[first : last + 1]
+        del self._directory_ids[first : last + 1]
+        del self._library_ids[first : last + 1]
+
+    def path(self, row: int) -> str:
+        offsets = self._file_name_offsets
+        return os.path.join(
+            self._directories[self._directory_ids[row]],
+            self._file_names[offsets[row] : offsets[row + 1]],
+        )
+
+    def display_name(self, row: int) -> str:
+        start = self._file_name_offsets[row]
+        return self._file_names[start : start + self._stem_lengths[row]]
+
+    def library_name(self, row: int) -> str:
+        return self._library_names[self._library_ids[row]]
+
+    def node(self, row: int) -> NodeItem:
+        return NodeItem(Path(self.path(row)), self.library_name(row))
+
+    def entries(self, first: int, last: int) -> Iterator[Tuple[str, str]]:
+        """Iterate over the display and library names of the given rows."""
+        file_names = self._file_names
+        offsets = self._file_name_offsets
+        stem_lengths = self._stem_lengths
+        library_names = self._library_names
+        for row in range(first, last + 1):
+            start = offsets[row]
+            yield (
+                file_names[start : start + stem_lengths[row]],
+                library_names[self._library_ids[row]],
+            )
+
+    def library_paths(self) -> Dict[str, List[Path]]:
+        """Return the node paths of every library."""
+        library_paths: Dict[str, List[Path]] = {}
+        for row in range(self.size()):
+            library_paths.setdefault(self.library_name(row), []).append(
+                Path(self.path(row))
+            )
+        return library_paths
+
+
 class NodeListModel(QAbstractListModel):
-    """List model of all the registered orodruin nodes."""
+    """List model of all the registered orodruin nodes.
 
-    def __init__(self, parent: Optional[QObject] = None) -> None:
+    The nodes are loaded from the on-disk library index, only the libraries
+    modified since it was saved are scanned again. The directories of the
+    libraries are then watched and the rows of the modified libraries updated.
+    Scans run in the background.
+
+    Views only see the rows fetched so far, more are fetched as they scroll.
+    """
+
+    scan_started = Signal()
+    # Number of libraries scanned, number of libraries.
+    scan_progress = Signal(int, int)
+    scan_finished = Signal()
+    # Emitted when nodes are stored or deleted, fetched by the views or not.
+    # First row, last row.
+    nodes_added = Signal(int, int)
+    nodes_removed = Signal(int, int)
+
+    def __init__(
+        self,
+        parent: Optional[QObject] = None,
+        library_index_path: Optional[Path] = None,
+        fetch_batch_size: int = 1000,
+    ) -> None:
         super().__init__(parent=parent)
 
-        self._nodes: List[NodeItem] = []
-        self.refresh_nodes_list()
+        if library_index_path is None:
+            library_index_path = LibraryIndex.default_path()
+        self._library_index = LibraryIndex(library_index_path)
 
-    def nodes(self) -> List[NodeItem]:
-        """The nodes stored in this model."""
+        self._nodes = NodeTable()
+        # Number of rows exposed to the views.
+        self._fetched_rows = 0
+        self._fetch_batch_size = fetch_batch_size
+
+        self._scanner: Optional[LibraryScanner] = None
+        # Cancelled scanners still running, until their finished signal.
+        self._cancelled_scanners: List[LibraryScanner] = []
+        # A full scan streams its nodes into the emptied model, a library update
+        # collects them and only inserts or removes the rows that changed.
+        self._full_scan = False
+        self._scanned_nodes: Dict[str, List[Path]] = {}
+
+        self._pending_libraries: Set[str] = set()
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(250)
+        self._update_timer.timeout.connect(self._update_pending_libraries)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        if not self._library_index.load():
+            self.refresh_nodes_list()
+            return
+
+        registered_libraries = {
+            library.name() for library in LibraryManager.libraries()
+        }
+        indexed_libraries = self._library_index.library_names()
+        for library_name in indexed_libraries - registered_libraries:
+            self._library_index.remove_library(library_name)
+        self._append_nodes(self._library_index.nodes())
+        self._watch_library_directories()
+        self.update_libraries(
+            self._library_index.stale_libraries()
+            | (registered_libraries - indexed_libraries)
+        )
+
+    def nodes(self) -> NodeTable:
+        """The nodes stored in this model, including the rows not fetched yet."""
         return self._nodes
 
+    def node(self, row: int) -> NodeItem:
+        """Return the node at the given row."""
+        return self._nodes.node(row)
+
+    def is_scanning(self) -> bool:
+        return self._scanner is not None
+
+    def library_index(self) -> LibraryIndex:
+        return self._library_index
+
     def refresh_nodes_list(self):
-        """Refresh the node list."""
+        """Scan all the libraries again from scratch, on a worker thread."""
+        self.cancel_refresh()
+        self._pending_libraries.clear()
+
         self.beginResetModel()
-        self._nodes = []
-        for library in LibraryManager.libraries():
-            self._nodes.extend(
-                [
-                    NodeItem(node_path, library.name())
-                    for node_path in library.nodes("orodruin")
-                ]
-            )
+        self._nodes.clear()
+        self._fetched_rows = 0
         self.endResetModel()
 
+        self._full_scan = True
+        self._start_scan(LibraryScanner(parent=self))
+
+    def update_libraries(self, library_names: Iterable[str]) -> None:
+        """Scan the given libraries and update their rows once the scan is done."""
+        self._pending_libraries.update(library_names)
+        if self._scanner is not None or not self._pending_libraries:
+            # Pending libraries are updated after the current scan.
+            return
+
+        library_names = self._pending_libraries
+        self._pending_libraries = set()
+        self._full_scan = False
+        self._scanned_nodes = {}
+        self._start_scan(LibraryScanner(library_names, parent=self))
+
+    def _update_pending_libraries(self) -> None:
+        self.update_libraries(())
+
+    def _start_scan(self, scanner: LibraryScanner) -> None:
+        scanner.nodes_found.connect(self._on_nodes_found)
+        scanner.progress.connect(self._on_scan_progress)
+        scanner.finished.connect(self._on_scan_finished)
+        scanner.finished.connect(scanner.deleteLater)
+        self._scanner = scanner
+        self.scan_started.emit()
+        scanner.start()
+
+    def cancel_refresh(self) -> None:
+        """Stop the current scan, keeping the nodes found so far.
+
+        The scanner thread stops on its own, what it sends meanwhile is ignored.
+        """
+        scanner = self._scanner
+        if scanner is None:
+            return
+        scanner.requestInterruption()
+        self._cancelled_scanners.append(scanner)
+        self._finish_scan()
+
+    def wait_for_scans(self, timeout: int) -> bool:
+        """Wait for the scanner threads to stop, return whether they all did.
+
+        The timeout is in milliseconds.
+        """
+        deadline = time.monotonic() + timeout / 1000
+        scanners = list(self._cancelled_scanners)
+        if self._scanner is not None:
+            scanners.append(self._scanner)
+        for scanner in scanners:
+            remaining = max(0, int((deadline - time.monotonic()) * 1000))
+            if not scanner.wait(remaining):
+                return False
+        return True
+
+    def _on_scan_progress(self, scanned: int, total: int) -> None:
+        if self.sender() is self._scanner:
+            self.scan_progress.emit(scanned, total)
+
+    def _on_scan_finished(self) -> None:
+        scanner = self.sender()
+        if scanner in self._cancelled_scanners:
+            self._cancelled_scanners.remove(scanner)
+            return
+        if scanner is None or scanner is not self._scanner:
+            return
+
+        if self._full_scan:
+            scanned_nodes = self._nodes.library_paths()
+        else:
+            scanned_nodes = self._scanned_nodes
+        self._scanned_nodes = {}
+
+        if self._full_scan:
+            for library_name in self._library_index.library_names() - set(
+                scanner.scanned_libraries()
+            ):
+                self._library_index.remove_library(library_name)
+        for library_name in scanner.scanned_libraries():
+            added, removed = self._library_index.update_library(
+                library_name,
+                scanned_nodes.get(library_name, []),
+                scanner.library_directories(library_name),
+            )
+            if not self._full_scan:
+                self._remove_nodes(removed)
+                self._append_nodes([(path, library_name) for path in added])
+        self._library_index.save()
+        self._watch_library_directories()
+
+        self._finish_scan()
+        self.update_libraries(())
+
+    def _finish_scan(self) -> None:
+        self._scanner = None
+        self.scan_finished.emit()
+
+    def _on_nodes_found(self, nodes: List[Tuple[Path, str]]) -> None:
+        # Chunks still queued from a cancelled scan are dropped.
+        if self.sender() is not self._scanner:
+            return
+        if self._full_scan:
+            self._append_nodes(nodes)
+            return
+        for path, library_name in nodes:
+            self._scanned_nodes.setdefault(library_name, []).append(path)
+
+    def _append_nodes(self, nodes: Iterable[Tuple[Path, str]]) -> None:
+        first = self._nodes.size()
+        self._nodes.append(nodes)
+        last = self._nodes.size() - 1
+        if last < first:
+            return
+        self.nodes_added.emit(first, last)
+        self._fetch_first_batch()
+
+    def _remove_nodes(self, paths: Iterable[Path]) -> None:
+        paths = {str(path) for path in paths}
+        if not paths:
+            return
+        size = self._nodes.size()
+        # Remove contiguous runs of rows, from the last one.
+        row = size - 1
+        while row >= 0:
+            if self._nodes.path(row) not in paths:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._nodes.path(row) in paths:
+                row -= 1
+            self._delete_rows(row + 1, last)
+        if self._nodes.size() != size:
+            self._fetch_first_batch()
+
+    def _delete_rows(self, first: int, last: int) -> None:
+        # Only the fetched rows are known to the views.
+        fetched_last = min(last, self._fetched_rows - 1)
+        if fetched_last < first:
+            self._nodes.delete(first, last)
+        else:
+            self.beginRemoveRows(QModelIndex(), first, fetched_last)
+            self._nodes.delete(first, last)
+            self._fetched_rows -= fetched_last - first + 1
+            self.endRemoveRows()
+        self.nodes_removed.emit(first, last)
+
+    def _fetch_first_batch(self) -> None:
+        # Views only fetch more rows once they are scrolled to the end, the
+        # first batch is exposed right away.
+        if self._fetched_rows < self._fetch_batch_size:
+            self._fetch_rows(self._fetch_batch_size - self._fetched_rows)
+
+    def _fetch_rows(self, count: int) -> None:
+        count = min(count, self._nodes.size() - self._fetched_rows)
+        if count <= 0:
+            return
+        first = self._fetched_rows
+        self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self._fetched_rows += count
+        self.endInsertRows()
+
+    def _watch_library_directories(self) -> None:
+        watched = set(self._watcher.directories())
+        directories = set(self._library_index.directories())
+        if watched - directories:
+            self._watcher.removePaths(list(watched - directories))
+        if directories - watched:
+            self._watcher.addPaths(list(directories - watched))
+
+    def _on_directory_changed(self, directory: str) -> None:
+        library_name = self._library_index.directory_library(directory)
+        if library_name is None:
+            return
+        logger.debug("Library %s changed on disk.", library_name)
+        # Files are often written in bursts, update the library once they settle.
+        self._pending_libraries.add(library_name)
+        self._update_timer.start()
+
     def rowCount(
         self,
         parent: QModelIndex,  # pylint: disable=unused-argument
     ) -> int:
-        return len(self._nodes)
+        return self._fetched_rows
+
+    def canFetchMore(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+    ) -> bool:
+        return self._fetched_rows < self._nodes.size()
+
+    def fetchMore(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+    ) -> None:
+        self._fetch_rows(self._fetch_batch_size)
 
     def data(self, index: QModelIndex, role: int) -> Any:
         if index.isValid():
             if role == Qt.DisplayRole:
-                return self._nodes[index.row()].path.stem
+                return self._nodes.display_name(index.row())
 
         return None
@@ -0,0 +1,225 @@
+import heapq
+import json
+import logging
+import re
+import time
+from collections import Counter
+from math import ceil, log1p
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import attr
+from PySide2.QtCore import QSettings
+
+logger = logging.getLogger(__name__)
+
+_WORD_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in _WORD_SEPARATORS.split(text.lower()) if word]
+
+
+def _is_subsequence(text: str, name: str) -> bool:
+    """Return whether the letters of the text appear in order in the name."""
+    letters = iter(name)
+    return all(letter in letters for letter in text)
+
+
+def _trigrams(word: str) -> List[str]:
+    """Return the trigrams of a word, padded so short prefixes have trigrams too."""
+    padded = "  " + word + " "
+    return [padded[index : index + 3] for index in range(len(padded) - 2)]
+
+
+def _query_trigrams(word: str, complete: bool) -> List[str]:
+    """Return the trigrams of a query word.
+
+    The trailing padding is left out of incomplete words, like the last word of
+    a query being typed. The first letter alone matches too many entries, it is
+    only used for single letter words.
+    """
+    padded = "  " + word + (" " if complete else "")
+    trigrams = [padded[index : index + 3] for index in range(len(padded) - 2)]
+    if len(trigrams) > 1:
+        del trigrams[0]
+    return trigrams
+
+
+@attr.s
+class NodeUsage:
+    """How often and how recently the library nodes were used, by node key."""
+
+    _settings_key: str = attr.ib(default="node_usage")
+    _max_entries: int = attr.ib(default=1000)
+
+    # Key -> use count, last use time.
+    _usage: Dict[str, Tuple[int, float]] = attr.ib(init=False, factory=dict)
+
+    @staticmethod
+    def _settings() -> QSettings:
+        return QSettings("HolisticCoders", "orodruin-editor")
+
+    def load(self) -> None:
+        value = self._settings().value(self._settings_key)
+        if not value:
+            return
+        try:
+            self._usage = {
+                key: (count, last_use) for key, (count, last_use) in json.loads(value)
+            }
+        except (TypeError, ValueError) as e:
+            logger.debug("Could not load the node usage: %s", e)
+
+    def save(self) -> None:
+        value = json.dumps([(key, usage) for key, usage in self._usage.items()])
+        self._settings().setValue(self._settings_key, value)
+
+    def record(self, key: str) -> None:
+        """Record a use of the node of the given key."""
+        count, _ = self._usage.get(key, (0, 0.0))
+        self._usage[key] = (count + 1, time.time())
+        if len(self._usage) > self._max_entries:
+            least_recent = min(self._usage, key=lambda key: self._usage[key][1])
+            del self._usage[least_recent]
+
+    def boost(self, key: str, now: Optional[float] = None) -> float:
+        """Return the score bonus of a node, from its use count and last use."""
+        usage = self._usage.get(key)
+        if usage is None:
+            return 0.0
+        count, last_use = usage
+        if now is None:
+            now = time.time()
+        age_in_days = max(0.0, now - last_use) / 86400
+        return 0.1 * log1p(count) + 0.3 * 0.5**age_in_days
+
+
+@attr.s
+class NodeSearchIndex:
+    """Trigram index of the node names, for fuzzy search.
+
+    Entries are numbered in the order they are added. Removed entries are only
+    marked as such, so the following ones keep their number. The trigrams of a
+    query select the candidates, only those are scored. Library names are too
+    few to be indexed, query words matching one boost its entries instead.
+    """
+
+    # Ratio of the query trigrams an entry must have to be a match.
+    _min_overlap: float = attr.ib(default=0.3)
+
+    # Lowercase names with their words separated by spaces.
+    _names: List[str] = attr.ib(init=False, factory=list)
+    _library_names: List[str] = attr.ib(init=False, factory=list)
+    _keys: List[str] = attr.ib(init=False, factory=list)
+    _postings: Dict[str, List[int]] = attr.ib(init=False, factory=dict)
+    _removed: Set[int] = attr.ib(init=False, factory=set)
+
+    def clear(self) -> None:
+        self._names = []
+        self._library_names = []
+        self._keys = []
+        self._postings = {}
+        self._removed = set()
+
+    def size(self) -> int:
+        """Return the number of entries added, removed ones included."""
+        return len(self._names)
+
+    def removed_count(self) -> int:
+        return len(self._removed)
+
+    def remove(self, entries: Iterable[int]) -> None:
+        """Leave the given entries out of the following searches."""
+        self._removed.update(entries)
+
+    def add(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Index entries of node name, library name after the existing ones."""
+        postings = self._postings
+        for name, library_name in entries:
+            entry = len(self._names)
+            words = _words(name)
+            self._names.append(" ".join(words))
+            self._library_names.append(" ".join(_words(library_name)))
+            self._keys.append(node_key(name, library_name))
+            trigrams = set()
+            for word in words:
+                trigrams.update(_trigrams(word))
+            for trigram in trigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    postings[trigram] = [entry]
+                else:
+                    posting.append(entry)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 500,
+        usage: Optional[NodeUsage] = None,
+    ) -> List[int]:
+        """Return the best entries matching the query, best first."""
+        words = _words(query)
+        if not words:
+            return []
+
+        query_trigrams = []
+        for index, word in enumerate(words):
+            query_trigrams.extend(
+                _query_trigrams(word, complete=index < len(words) - 1)
+            )
+
+        hits: Counter = Counter()
+        for trigram in query_trigrams:
+            hits.update(self._postings.get(trigram, ()))
+        if not hits:
+            return []
+
+        min_hits = max(1, ceil(len(query_trigrams) * self._min_overlap))
+        query_text = " ".join(words)
+        query_letters = "".join(words)
+        now = time.time()
+
+        def score(entry: int) -> float:
+            name = self._names[entry]
+            value = hits[entry] / len(query_trigrams)
+            if name.startswith(query_text):
+                value += 0.5
+            elif query_text in name:
+                value += 0.25
+            elif _is_subsequence(query_letters, name):
+                # Typos dropping letters, like "twst" for "twist".
+                value += 0.15
+            library_name = self._library_names[entry]
+            if any(library_name.startswith(word) for word in words):
+                value += 0.2
+            if usage is not None:
+                value += usage.boost(self._keys[entry], now)
+            # Shorter names are closer matches.
+            return value - len(name) * 0.01
+
+        if self._removed:
+            for entry in self._removed.intersection(hits):
+                del hits[entry]
+
+        # Only the entries sharing the most trigrams with the query are scored.
+        candidates = [
+            entry
+            for entry, count in heapq.nlargest(
+                limit * 4, hits.items(), key=itemgetter(1)
+            )
+            if count >= min_hits
+        ]
+        return heapq.nlargest(limit, candidates, key=score)
+
+
+def node_key(name: str, library_name: str) -> str:
+    """Return the key identifying a library node across sessions."""
+    return f"{library_name}/{name}"
+
+
+__all__ = [
+    "NodeSearchIndex",
+    "NodeUsage",
+    "node_key",
+]
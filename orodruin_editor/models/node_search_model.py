@@ -0,0 +1,247 @@
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Any, List, Optional
+
+from PySide2.QtCore import QAbstractListModel, QModelIndex, QObject, Qt, QTimer
+
+from .node_list_model import NodeItem, NodeListModel
+from .node_search_index import NodeSearchIndex, NodeUsage, node_key
+
+logger = logging.getLogger(__name__)
+
+
+class NodeSearchModel(QAbstractListModel):
+    """Node list model filtered and ranked by a fuzzy search query.
+
+    Without a query, the rows of the node list model are passed through as is,
+    fetched as the view scrolls. The search index is built in the background
+    as the source nodes are added, including the rows the source model has not
+    fetched yet. Searches only cover the rows indexed so far, their results
+    grow as the indexing goes on. The source model is never reset by a search.
+    """
+
+    def __init__(
+        self,
+        source_model: NodeListModel,
+        parent: Optional[QObject] = None,
+        result_limit: int = 500,
+        index_chunk_size: int = 1000,
+        min_query_length: int = 2,
+        search_delay: int = 100,  # in milliseconds
+        refresh_interval: int = 500,  # in milliseconds
+    ) -> None:
+        super().__init__(parent=parent)
+
+        self._source_model = source_model
+        self._result_limit = result_limit
+        self._index_chunk_size = index_chunk_size
+        # Shorter queries match most of the library, all the nodes are shown.
+        self._min_query_length = min_query_length
+
+        self._query = ""
+        # Source rows of the search results, None when there is no query.
+        self._rows: Optional[List[int]] = None
+
+        self._search_index = NodeSearchIndex()
+        # Index entry of each indexed source row. Rows and entries are both in
+        # insertion order, so the row of an entry is found by bisection.
+        self._row_entries = array("I")
+        self._usage = NodeUsage()
+        self._usage.load()
+
+        self._index_timer = QTimer(self)
+        self._index_timer.setSingleShot(True)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_next_chunk)
+
+        # Searches wait for the typing to pause.
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(search_delay)
+        self._search_timer.timeout.connect(self._update_results)
+        # Nodes added while a query is shown update the results at most every
+        # refresh interval, not once per scanned chunk.
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(refresh_interval)
+        self._refresh_timer.timeout.connect(self._update_results)
+
+        source_model.rowsAboutToBeInserted.connect(self._on_rows_about_to_be_inserted)
+        source_model.rowsInserted.connect(self._on_rows_inserted)
+        source_model.rowsAboutToBeRemoved.connect(self._on_rows_about_to_be_removed)
+        source_model.rowsRemoved.connect(self._on_rows_removed)
+        source_model.modelAboutToBeReset.connect(self.beginResetModel)
+        source_model.modelReset.connect(self._on_model_reset)
+        source_model.nodes_added.connect(self._on_nodes_added)
+        source_model.nodes_removed.connect(self._on_nodes_removed)
+
+        self._index_timer.start()
+
+    def source_model(self) -> NodeListModel:
+        return self._source_model
+
+    def query(self) -> str:
+        return self._query
+
+    def set_query(self, query: str) -> None:
+        """Show the nodes matching the query, best match first."""
+        query = query.strip()
+        if query == self._query:
+            return
+        self._query = query
+        self._search_timer.start()
+
+    def node(self, row: int) -> NodeItem:
+        """Return the node at the given row."""
+        return self._source_model.node(self.source_row(row))
+
+    def source_row(self, row: int) -> int:
+        """Return the row of the source model the given row shows."""
+        if self._rows is None:
+            return row
+        return self._rows[row]
+
+    def record_use(self, nodes: List[NodeItem]) -> None:
+        """Rank the given nodes higher in the following searches."""
+        for node in nodes:
+            self._usage.record(node_key(node.path.stem, node.library_name))
+        self._usage.save()
+
+    def _update_results(self) -> None:
+        self._refresh_timer.stop()
+        rows = self._search()
+        if rows is None and self._rows is None:
+            return
+        # Only the results are reset, not the source model.
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def _search(self) -> Optional[List[int]]:
+        if len(self._query) < self._min_query_length:
+            return None
+        entries = self._search_index.search(
+            self._query, self._result_limit, self._usage
+        )
+        return [bisect_left(self._row_entries, entry) for entry in entries]
+
+    def _clear_index(self) -> None:
+        self._search_index.clear()
+        self._row_entries = array("I")
+
+    def _index_rows(self, row_count: int) -> None:
+        first = len(self._row_entries)
+        if row_count <= first:
+            return
+        first_entry = self._search_index.size()
+        self._search_index.add(self._source_model.nodes().entries(first, row_count - 1))
+        self._row_entries.extend(range(first_entry, first_entry + row_count - first))
+
+    def _index_next_chunk(self) -> None:
+        row_count = self._source_model.nodes().size()
+        self._index_rows(
+            min(row_count, len(self._row_entries) + self._index_chunk_size)
+        )
+        if len(self._row_entries) < row_count:
+            self._index_timer.start()
+        # The newly indexed rows may match the query.
+        if self._rows is not None and not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _on_nodes_added(
+        self,
+        first: int,  # pylint: disable=unused-argument
+        last: int,  # pylint: disable=unused-argument
+    ) -> None:
+        # The results are updated once the new nodes are indexed.
+        self._index_timer.start()
+
+    def _on_nodes_removed(self, first: int, last: int) -> None:
+        # The entries of the removed rows are left out of the index, the
+        # following rows keep their entries.
+        indexed_last = min(last, len(self._row_entries) - 1)
+        if first <= indexed_last:
+            self._search_index.remove(self._row_entries[first : indexed_last + 1])
+            del self._row_entries[first : indexed_last + 1]
+        # Rebuild the index once it is mostly made of removed entries.
+        if self._search_index.removed_count() > len(self._row_entries):
+            self._clear_index()
+            self._index_timer.start()
+
+        if self._rows is None:
+            return
+        self.beginResetModel()
+        self._rows = self._search()
+        self.endResetModel()
+
+    def _on_rows_about_to_be_inserted(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+        first: int,
+        last: int,
+    ) -> None:
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+        first: int,  # pylint: disable=unused-argument
+        last: int,  # pylint: disable=unused-argument
+    ) -> None:
+        if self._rows is None:
+            self.endInsertRows()
+
+    def _on_rows_about_to_be_removed(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+        first: int,
+        last: int,
+    ) -> None:
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    def _on_rows_removed(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+        first: int,  # pylint: disable=unused-argument
+        last: int,  # pylint: disable=unused-argument
+    ) -> None:
+        if self._rows is None:
+            self.endRemoveRows()
+
+    def _on_model_reset(self) -> None:
+        self._clear_index()
+        self._rows = self._search()
+        self.endResetModel()
+        self._index_timer.start()
+
+    def rowCount(
+        self,
+        parent: QModelIndex,  # pylint: disable=unused-argument
+    ) -> int:
+        if self._rows is None:
+            return self._source_model.rowCount(QModelIndex())
+        return len(self._rows)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        # Search results are all shown at once.
+        if self._rows is None:
+            return self._source_model.canFetchMore(parent)
+        return False
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if self._rows is None:
+            self._source_model.fetchMore(parent)
+
+    def data(self, index: QModelIndex, role: int) -> Any:
+        if not index.isValid():
+            return None
+        # Results may show source rows not fetched by the source model yet.
+        if role == Qt.DisplayRole:
+            return self._source_model.nodes().display_name(self.source_row(index.row()))
+        return None
+
+
+__all__ = ["NodeSearchModel"]
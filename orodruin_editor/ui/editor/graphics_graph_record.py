@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+import attr
+from orodruin.core.connection import Connection
+from orodruin.core.graph import Graph
+from orodruin.core.node import Node
+from orodruin.core.port.port import Port
+from PySide2.QtCore import QPointF
+from PySide2.QtWidgets import QGraphicsScene
+
+from orodruin_editor.core.tracing import traced
+
+from .graphics_graph import GraphicsGraph
+
+if TYPE_CHECKING:
+    from .graphics_state import GraphicsState
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(eq=False)
+class GraphicsGraphRecord:
+    """Lightweight record of an Orodruin Graph.
+
+    The record tracks the content of the graph and only builds its
+    GraphicsGraph scene the first time it is needed.
+    """
+
+    _graphics_state: GraphicsState = attr.ib()
+    _uuid: UUID = attr.ib()
+
+    # Dicts are used as ordered sets to rebuild the scene in registration order.
+    _nodes: Dict[UUID, None] = attr.ib(init=False, factory=dict)
+    _ports: Dict[UUID, None] = attr.ib(init=False, factory=dict)
+    _connections: Dict[UUID, None] = attr.ib(init=False, factory=dict)
+    _parent_ports: Dict[UUID, None] = attr.ib(init=False, factory=dict)
+
+    # State of the input and output nodes, kept while the scene is released.
+    _input_output_positions: Optional[Tuple[QPointF, QPointF]] = attr.ib(
+        init=False, default=None
+    )
+    _expanded_virtual_ports: Set[UUID] = attr.ib(init=False, factory=set)
+
+    _graphics_graph: Optional[GraphicsGraph] = attr.ib(init=False, default=None)
+
+    @classmethod
+    def from_graph(
+        cls, graphics_state: GraphicsState, graph: Graph
+    ) -> GraphicsGraphRecord:
+        record = cls(graphics_state, graph.uuid())
+        graph.node_registered.subscribe(record.register_node)
+        graph.node_unregistered.subscribe(record.unregister_node)
+        graph.port_registered.subscribe(record.register_port)
+        graph.port_unregistered.subscribe(record.unregister_port)
+        graph.connection_registered.subscribe(record.register_connection)
+        graph.connection_unregistered.subscribe(record.unregister_connection)
+
+        parent_node = graph.parent_node()
+        if parent_node:
+            parent_node.port_registered.subscribe(record.register_parent_port)
+            parent_node.port_unregistered.subscribe(record.unregister_parent_port)
+
+        return record
+
+    def uuid(self) -> UUID:
+        """Return the UUID of the graph."""
+        return self._uuid
+
+    def item_count(self) -> int:
+        """Return the number of nodes, ports and connections of the graph."""
+        return (
+            len(self._nodes)
+            + len(self._ports)
+            + len(self._connections)
+            + len(self._parent_ports)
+        )
+
+    def is_materialized(self) -> bool:
+        """Return whether the scene of this graph has been built."""
+        return self._graphics_graph is not None
+
+    def graphics_graph(self) -> GraphicsGraph:
+        """Return the scene of this graph, building it if needed."""
+        if self._graphics_graph is None:
+            self._graphics_graph = self._build_graphics_graph()
+        return self._graphics_graph
+
+    def release_graphics_graph(self) -> None:
+        """Destroy the scene of this graph and the graphics items of its content.
+
+        Items of the graph built outside of its scene, by lookups from other
+        graphs, are released as well. The graphics state keeps what it needs
+        to rebuild them identically.
+        """
+        graphics_graph = self._graphics_graph
+        if graphics_graph is not None:
+            # The scene is going away, don't update its index for every item.
+            graphics_graph.setItemIndexMethod(QGraphicsScene.NoIndex)
+
+        for connection_id in self._connections:
+            self._graphics_state.release_graphics_connection(connection_id)
+        for node_id in self._nodes:
+            self._graphics_state.release_graphics_node(node_id)
+
+        if graphics_graph is None:
+            return
+
+        # The input and output nodes aren't in the graphics state.
+        input_graphics_node = graphics_graph.input_graphics_node()
+        output_graphics_node = graphics_graph.output_graphics_node()
+        if input_graphics_node and output_graphics_node:
+            self._input_output_positions = (
+                input_graphics_node.pos(),
+                output_graphics_node.pos(),
+            )
+        self._expanded_virtual_ports = {
+            graphics_port.uuid()
+            for graphics_port in graphics_graph.virtual_graphics_ports()
+            if graphics_port.is_expanded()
+        }
+
+        # Only the input and output nodes are left in the scene.
+        graphics_graph.clear()
+        self._graphics_graph = None
+        logger.debug("Released graphics graph %s.", self._uuid)
+
+    @traced("editor")
+    def _build_graphics_graph(self) -> GraphicsGraph:
+        state = self._graphics_state.state()
+        graphics_graph = GraphicsGraph(self._graphics_state, self._uuid)
+
+        if self._graphics_state.get_graph(self._uuid).parent_node():
+            graphics_graph.create_input_output_nodes()
+            if self._input_output_positions:
+                input_position, output_position = self._input_output_positions
+                graphics_graph.input_graphics_node().setPos(input_position)
+                graphics_graph.output_graphics_node().setPos(output_position)
+            for port_id in self._parent_ports:
+                graphics_graph.create_virtual_port(state.get_port(port_id))
+            for port_id in self._expanded_virtual_ports & self._parent_ports.keys():
+                graphics_graph.get_virtual_port(port_id).set_expanded(True)
+            self._expanded_virtual_ports = set()
+
+        with self._graphics_state.batch():
+            for node_id in self._nodes:
+                graphics_graph.register_graphics_node(state.get_node(node_id))
+            for port_id in self._ports:
+                graphics_graph.register_graphics_port(state.get_port(port_id))
+            for connection_id in self._connections:
+                graphics_graph.register_graphics_connection(
+                    state.get_connection(connection_id)
+                )
+
+        logger.debug("Materialized graphics graph %s.", self._uuid)
+        return graphics_graph
+
+    @traced("signal")
+    def register_node(self, node: Node) -> None:
+        self._nodes[node.uuid()] = None
+        if self._graphics_graph is not None:
+            self._graphics_graph.register_graphics_node(node)
+
+    @traced("signal")
+    def unregister_node(self, node: Node) -> None:
+        # Undo, grouping or deleting the node leave its rename editor stale.
+        self._graphics_state.cancel_node_rename(node)
+        del self._nodes[node.uuid()]
+        if self._graphics_graph is not None:
+            self._graphics_graph.unregister_graphics_node(node)
+
+    @traced("signal")
+    def register_port(self, port: Port) -> None:
+        self._ports[port.uuid()] = None
+        if self._graphics_graph is not None:
+            self._graphics_graph.register_graphics_port(port)
+
+    @traced("signal")
+    def unregister_port(self, port: Port) -> None:
+        del self._ports[port.uuid()]
+        if self._graphics_graph is not None:
+            self._graphics_graph.unregister_graphics_port(port)
+
+    @traced("signal")
+    def register_connection(self, connection: Connection) -> None:
+        self._connections[connection.uuid()] = None
+        if self._graphics_graph is not None:
+            self._graphics_graph.register_graphics_connection(connection)
+
+    @traced("signal")
+    def unregister_connection(self, connection: Connection) -> None:
+        del self._connections[connection.uuid()]
+        if self._graphics_graph is not None:
+            self._graphics_graph.unregister_graphics_connection(connection)
+
+    @traced("signal")
+    def register_parent_port(self, port: Port) -> None:
+        self._parent_ports[port.uuid()] = None
+        if self._graphics_graph is not None:
+            self._graphics_graph.create_virtual_port(port)
+
+    @traced("signal")
+    def unregister_parent_port(self, port: Port) -> None:
+        del self._parent_ports[port.uuid()]
+        if self._graphics_graph is not None:
+            self._graphics_graph.delete_virtual_port(port)
+
+
+__all__ = ["GraphicsGraphRecord"]
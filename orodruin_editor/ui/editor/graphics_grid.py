@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import math
+from typing import Dict
+
+import attr
+from PySide2.QtCore import QLineF, QPointF, QRectF
+from PySide2.QtGui import QColor, QPainter, QPen, QPixmap
+
+
+@attr.s
+class GraphicsGrid:
+    """Background grid of a graphics graph.
+
+    The grid repeats every cell, so a single cell is pre-rendered to a tile per
+    zoom bucket and tiled over the exposed rect instead of drawing every line.
+    """
+
+    _square_size: int = attr.ib(default=25)  # in pixels
+    _cell_size: int = attr.ib(default=10)  # in squares
+
+    # Below this zoom, only the cell lines are drawn.
+    _square_lines_min_zoom: float = attr.ib(default=0.4)
+
+    _min_zoom_bucket: float = attr.ib(init=False, default=1 / 16)
+    _max_zoom_bucket: float = attr.ib(init=False, default=4)
+
+    _background_color: QColor = attr.ib(init=False)
+    _square_color: QColor = attr.ib(init=False)
+    _cell_color: QColor = attr.ib(init=False)
+
+    _pen_square: QPen = attr.ib(init=False)
+    _pen_cell: QPen = attr.ib(init=False)
+
+    _tiles: Dict[float, QPixmap] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self) -> None:
+        self._background_color = QColor("#191919")
+        self._square_color = QColor("#2f2f2f")
+        self._cell_color = QColor("#2f2f2f")
+
+        self._pen_square = QPen(self._square_color)
+        self._pen_square.setWidthF(0.5)
+        self._pen_cell = QPen(self._cell_color)
+        self._pen_cell.setWidth(2)
+
+    def square_size(self) -> int:
+        """Return the size of a square in pixels."""
+        return self._square_size
+
+    def cell_size(self) -> int:
+        """Return the size of a cell in pixels."""
+        return self._square_size * self._cell_size
+
+    def background_color(self) -> QColor:
+        return self._background_color
+
+    def zoom_bucket(self, zoom: float) -> float:
+        """Return the power of two closest to the given zoom."""
+        bucket = 2 ** round(math.log2(max(zoom, 1e-6)))
+        return min(max(bucket, self._min_zoom_bucket), self._max_zoom_bucket)
+
+    def tile(self, zoom: float) -> QPixmap:
+        """Return the pre-rendered tile of one cell for the given zoom."""
+        bucket = self.zoom_bucket(zoom)
+        tile = self._tiles.get(bucket)
+        if tile is None:
+            tile = self._render_tile(bucket)
+            self._tiles[bucket] = tile
+        return tile
+
+    def clear_tiles(self) -> None:
+        """Drop the pre-rendered tiles, for example after a color change."""
+        self._tiles.clear()
+
+    def _render_tile(self, bucket: float) -> QPixmap:
+        cell_size = self.cell_size()
+        tile_size = max(1, round(cell_size * bucket))
+
+        tile = QPixmap(tile_size, tile_size)
+        tile.fill(self._background_color)
+
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(tile_size / cell_size, tile_size / cell_size)
+
+        if bucket >= self._square_lines_min_zoom:
+            painter.setPen(self._pen_square)
+            for index in range(1, self._cell_size):
+                offset = index * self._square_size
+                painter.drawLine(QLineF(offset, 0, offset, cell_size))
+                painter.drawLine(QLineF(0, offset, cell_size, offset))
+
+        # Cell lines sit on the tile edges, each tile draws one half of them.
+        painter.setPen(self._pen_cell)
+        for offset in (0, cell_size):
+            painter.drawLine(QLineF(offset, 0, offset, cell_size))
+            painter.drawLine(QLineF(0, offset, cell_size, offset))
+
+        painter.end()
+        return tile
+
+    def draw(self, painter: QPainter, rect: QRectF) -> None:
+        """Draw the grid over the given rect, in scene coordinates."""
+        tile = self.tile(painter.worldTransform().m11())
+        tile_scale = tile.width() / self.cell_size()
+
+        target = QRectF(
+            rect.left() * tile_scale,
+            rect.top() * tile_scale,
+            rect.width() * tile_scale,
+            rect.height() * tile_scale,
+        )
+        offset = QPointF(target.left() % tile.width(), target.top() % tile.height())
+
+        painter.save()
+        painter.scale(1 / tile_scale, 1 / tile_scale)
+        painter.drawTiledPixmap(target, tile, offset)
+        painter.restore()
+
+
+__all__ = ["GraphicsGrid"]
@@ -6,7 +6,16 @@ from uuid import UUID
 import attr
 from orodruin.core.connection import Connection, ConnectionLike
 from PySide2.QtCore import QPointF, QRectF, Qt
-from PySide2.QtGui import QColor, QLinearGradient, QPainter, QPainterPath, QPen
+from PySide2.QtGui import (
+    QBrush,
+    QColor,
+    QLinearGradient,
+    QPainter,
+    QPainterPath,
+    QPainterPathStroker,
+    QPen,
+    QPolygonF,
+)
 from PySide2.QtWidgets import (
     QGraphicsItem,
     QGraphicsPathItem,
@@ -14,12 +23,16 @@ from PySide2.QtWidgets import (
     QWidget,
 )
 
+from ..level_of_detail import level_of_detail
+from ..paint_profiler import profiled_paint
+from ..theme import PortStyle
+
 if TYPE_CHECKING:
     from ..graphics_state import GraphicsState
     from .graphics_port import GraphicsPort
 
 
-@attr.s
+@attr.s(eq=False)
 class GraphicsConnection(QGraphicsPathItem):
     _graphics_state: GraphicsState = attr.ib()
     _uuid: UUID = attr.ib()
@@ -30,9 +43,16 @@ class GraphicsConnection(QGraphicsPathItem):
 
     _mouse_position: QPointF = attr.ib(init=False)
 
-    _gradient: QLinearGradient = attr.ib(init=False)
-    _unselected_pen: QPen = attr.ib(init=False)
-    _selected_pen: QPen = attr.ib(init=False)
+    # The gradient follows the connection, the pen is built with the geometry.
+    _gradient_pen: QPen = attr.ib(init=False, factory=QPen)
+    _flat_pen: QPen = attr.ib(init=False, factory=QPen)
+
+    # Cached geometry, only rebuilt when one of the endpoints moved.
+    _geometry_dirty: bool = attr.ib(init=False, default=True)
+    _path: QPainterPath = attr.ib(init=False, factory=QPainterPath)
+    _polyline: QPolygonF = attr.ib(init=False, factory=QPolygonF)
+    _shape: QPainterPath = attr.ib(init=False, factory=QPainterPath)
+    _bounding_rect: QRectF = attr.ib(init=False, factory=QRectF)
 
     @classmethod
     def from_connection(
@@ -58,12 +78,6 @@ class GraphicsConnection(QGraphicsPathItem):
 
         self._mouse_position = QPointF(0, 0)
 
-        self._gradient = QLinearGradient(0, 0, 0, 0)
-        self._unselected_pen = QPen(self._gradient, 2)
-        self._selected_pen = QPen(Qt.white)
-        self._unselected_pen.setWidth(2)
-        self._selected_pen.setWidth(2)
-
         self.setFlag(QGraphicsItem.ItemIsSelectable)
         self.setZValue(-1)
 
@@ -78,88 +92,138 @@ class GraphicsConnection(QGraphicsPathItem):
 
     def set_source_graphics_port(self, graphics_port: GraphicsPort) -> None:
         self._source_graphics_port = graphics_port
+        self.invalidate_geometry()
 
     def set_target_graphics_port(self, graphics_port: GraphicsPort) -> None:
         self._target_graphics_port = graphics_port
+        self.invalidate_geometry()
 
     def mouse_position(self) -> QPointF:
         return self._mouse_position
 
     def set_mouse_position(self, position: QPointF):
         self._mouse_position = position
+        self.invalidate_geometry()
 
     def source_position(self) -> QPointF:
         """Returns the position of the source graphics port."""
         if not self._source_graphics_port:
-            return self.mouse_position
+            return self._mouse_position
         return self._source_graphics_port.scene_socket_position()
 
     def target_position(self) -> QPointF:
         """Returns the position of the target graphics port."""
         if not self._target_graphics_port:
-            return self.mouse_position
+            return self._mouse_position
         return self._target_graphics_port.scene_socket_position()
 
-    def source_color(self) -> QColor:
-        """Return the color of this connection's source socket"""
+    def source_port_style(self) -> PortStyle:
+        """Return the style of this connection's source socket"""
         if self._source_graphics_port:
-            return self._source_graphics_port.graphics_socket().color()
+            return self._source_graphics_port.graphics_socket().port_style()
         else:
             # This is likely a temporary connection that doesn't have a source yet.
-            # We just return the target's color to have a consistent gradient
-            return self._target_graphics_port.graphics_socket().color()
+            # We just return the target's style to have a consistent gradient
+            return self._target_graphics_port.graphics_socket().port_style()
 
-    def target_color(self) -> QColor:
+    def target_port_style(self) -> PortStyle:
         if self._target_graphics_port:
-            return self._target_graphics_port.graphics_socket().color()
+            return self._target_graphics_port.graphics_socket().port_style()
         else:
             # This is likely a temporary connection that doesn't have a target yet.
-            # We just return the target's color to have a consistent gradient
-            return self._source_graphics_port.graphics_socket().color()
+            # We just return the source's style to have a consistent gradient
+            return self._source_graphics_port.graphics_socket().port_style()
+
+    def source_color(self) -> QColor:
+        """Return the color of this connection's source socket"""
+        return self.source_port_style().color
+
+    def target_color(self) -> QColor:
+        return self.target_port_style().color
+
+    def invalidate_geometry(self) -> None:
+        """Mark the cached geometry as stale after one of the endpoints moved."""
+        if self._geometry_dirty:
+            return
+        self.prepareGeometryChange()
+        self._geometry_dirty = True
 
     def update_path(self):
-        """Update the connection's path."""
-        a = self.source_position()
-        b = self.source_position() + QPointF(25, 0)
-        c = self.target_position() - QPointF(25, 0)
-        d = self.target_position()
-
-        path = QPainterPath(a)
-        path.lineTo(b)
-        path.lineTo(c)
-        path.lineTo(d)
-        self.setPath(path)
+        """Rebuild the connection's cached path, gradient, pen and bounding rect."""
+        # The path is local to the connection, which is translated while the
+        # nodes at both of its ends are dragged together.
+        source_position = self.source_position() - self.pos()
+        target_position = self.target_position() - self.pos()
+        width = self._graphics_state.theme().connection_width
+        source_port_style = self.source_port_style()
+
+        self._polyline = QPolygonF(
+            [
+                source_position,
+                source_position + QPointF(25, 0),
+                target_position - QPointF(25, 0),
+                target_position,
+            ]
+        )
+        path = QPainterPath()
+        path.addPolygon(self._polyline)
+        self._path = path
+
+        stroker = QPainterPathStroker()
+        stroker.setWidth(width)
+        self._shape = stroker.createStroke(path)
+
+        gradient = QLinearGradient(source_position, target_position)
+        gradient.setColorAt(0, source_port_style.color)
+        gradient.setColorAt(1, self.target_color())
+        self._gradient_pen = QPen(QBrush(gradient), width)
+        self._flat_pen = source_port_style.connection_pen
+
+        margin = width / 2
+        self._bounding_rect = path.boundingRect().adjusted(
+            -margin, -margin, margin, margin
+        )
 
-    def boundingRect(self) -> QRectF:
+        self._geometry_dirty = False
 
-        source_pos = self.source_position()
-        target_pos = self.target_position()
-        source_target_vector = target_pos - source_pos
+    def path(self) -> QPainterPath:
+        if self._geometry_dirty:
+            self.update_path()
+        return self._path
 
-        x = source_pos.x()
-        y = source_pos.y()
-        width = source_target_vector.x()
-        height = source_target_vector.y()
+    def shape(self) -> QPainterPath:
+        if self._geometry_dirty:
+            self.update_path()
+        return self._shape
 
-        return QRectF(x, y, width, height)
+    def boundingRect(self) -> QRectF:
+        if self._geometry_dirty:
+            self.update_path()
+        return self._bounding_rect
 
+    @profiled_paint
     def paint(
         self,
         painter: QPainter,
-        option: QStyleOptionGraphicsItem,  # pylint: disable=unused-argument
+        option: QStyleOptionGraphicsItem,
         widget: Optional[QWidget],  # pylint: disable=unused-argument
     ) -> None:
-        self.update_path()
-        self._gradient.setStart(self.source_position())
-        self._gradient.setFinalStop(self.target_position())
-
-        self._gradient.setColorAt(0, self.source_color())
-        self._gradient.setColorAt(1, self.target_color())
-        self._unselected_pen = QPen(self._gradient, 2)
-        pen = self._unselected_pen if not self.isSelected() else self._selected_pen
+        if self._geometry_dirty:
+            self.update_path()
+
+        selected_pen = self._graphics_state.theme().connection_selected_pen
+
+        lod = level_of_detail(painter, option)
+        if lod < self._graphics_state.level_of_detail().connection_gradient:
+            pen = self._flat_pen if not self.isSelected() else selected_pen
+            painter.setPen(pen)
+            painter.drawPolyline(self._polyline)
+            return
+
+        pen = self._gradient_pen if not self.isSelected() else selected_pen
         painter.setPen(pen)
         painter.setBrush(Qt.NoBrush)
-        painter.drawPath(self.path())
+        painter.drawPath(self._path)
 
 
 GraphicsConnectionLike = Union[GraphicsConnection, ConnectionLike]
@@ -2,14 +2,14 @@ from __future__ import annotations
 
 import logging
 from math import floor
-from typing import TYPE_CHECKING, Any, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Set, Union
 from uuid import UUID
 
 import attr
 from orodruin.core.node import Node, NodeLike
 from orodruin.core.port.port import Port, PortDirection
 from PySide2.QtCore import QPointF, QRectF, Qt
-from PySide2.QtGui import QBrush, QColor, QPainter, QPainterPath, QPen
+from PySide2.QtGui import QPainter
 from PySide2.QtWidgets import (
     QApplication,
     QGraphicsItem,
@@ -20,6 +20,9 @@ from PySide2.QtWidgets import (
 
 from orodruin_editor.ui.editor.graphics_layouts import VerticalGraphicsLayout
 
+from ..level_of_detail import level_of_detail
+from ..paint_profiler import profiled_paint
+from ..shape_cache import NodeShapes
 from .graphics_node_name import GraphicsNodeName
 from .graphics_port import GraphicsPort, GraphicsPortLike
 
@@ -29,7 +32,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@attr.s
+@attr.s(eq=False)
 class GraphicsNode(QGraphicsItem):
 
     _graphics_state: GraphicsState = attr.ib()
@@ -37,19 +40,12 @@ class GraphicsNode(QGraphicsItem):
     _name: str = attr.ib()
     _parent: Optional[QGraphicsItem] = attr.ib(default=None)
 
-    _graphics_ports: List[UUID] = attr.ib(init=False, factory=list)
+    _graphics_ports: Set[GraphicsPort] = attr.ib(init=False, factory=set)
 
     _header_height: int = attr.ib(init=False, default=30)
+    _height: float = attr.ib(init=False, default=30)
     _corner_radius: float = attr.ib(init=False)
-
-    _header_color: QBrush = attr.ib(init=False)
-    _header_brush: QBrush = attr.ib(init=False)
-
-    _background_color: QColor = attr.ib(init=False)
-    _background_brush: QBrush = attr.ib(init=False)
-
-    _outline_pen_default: QPen = attr.ib(init=False)
-    _outline_pen_selected: QPen = attr.ib(init=False)
+    _shapes: NodeShapes = attr.ib(init=False)
 
     _name_item: GraphicsNodeName = attr.ib(init=False)
     _input_port_layout: VerticalGraphicsLayout = attr.ib(init=False)
@@ -64,11 +60,7 @@ class GraphicsNode(QGraphicsItem):
         node: Node,
         parent: Optional[QGraphicsItem] = None,
     ) -> GraphicsNode:
-        graphics_node = cls(graphics_state, node.uuid(), node.name(), parent)
-        node.port_registered.subscribe(graphics_node.register_graphics_port)
-        node.port_unregistered.subscribe(graphics_node.unregister_graphics_port)
-        node.name_changed.subscribe(graphics_node.set_name)
-        return graphics_node
+        return cls(graphics_state, node.uuid(), node.name(), parent)
 
     def __attrs_post_init__(self) -> None:
         super().__init__(parent=self._parent)
@@ -76,20 +68,12 @@ class GraphicsNode(QGraphicsItem):
         self.setFlag(QGraphicsItem.ItemIsSelectable)
         self.setFlag(QGraphicsItem.ItemIsMovable)
         self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
-
-        self._header_color = QColor("#2B6299")
-        self._header_brush = QBrush(self._header_color)
-
-        self._background_color = QColor("#333333")
-        self._background_brush = QBrush(self._background_color)
+        self.setFlag(QGraphicsItem.ItemSendsScenePositionChanges)
 
         self._name_item = GraphicsNodeName(self._graphics_state, self._name, self)
 
         self._corner_radius = 5
-
-        self._outline_pen_default = Qt.NoPen
-        self._outline_pen_selected = QPen(Qt.white)
-        self._outline_pen_selected.setWidth(5)
+        self._update_shapes()
 
         self._port_layout = VerticalGraphicsLayout(self)
         self._port_layout.setPos(0, self._header_height)
@@ -117,10 +101,25 @@ class GraphicsNode(QGraphicsItem):
 
     def height(self) -> int:
         """Return the height of the graphics node."""
-        return (
+        return self._height
+
+    def update_geometry(self) -> None:
+        """Recompute the cached height of the node after its ports changed."""
+        height = (
             self._header_height
-            + self._input_port_layout.boundingRect().height()
-            + self._output_port_layout.boundingRect().height()
+            + self._input_port_layout.effective_bounding_rect().height()
+            + self._output_port_layout.effective_bounding_rect().height()
+        )
+        if height == self._height:
+            return
+
+        self.prepareGeometryChange()
+        self._height = height
+        self._update_shapes()
+
+    def _update_shapes(self) -> None:
+        self._shapes = self._graphics_state.shape_cache().node_shapes(
+            self.width(), self._height, self._header_height, self._corner_radius
         )
 
     def register_graphics_port(self, graphics_port: GraphicsPortLike) -> None:
@@ -134,9 +133,11 @@ class GraphicsNode(QGraphicsItem):
         else:
             graphics_port = self._graphics_state.get_graphics_port(graphics_port)
 
-        parent_port = graphics_port.parent_port()
-        if parent_port and graphics_port.is_virtual():
-            parent_port = self.scene().get_virtual_port(parent_port.uuid())
+        parent_port_id = graphics_port.parent_port_id()
+        if parent_port_id and graphics_port.is_virtual():
+            parent_port = self.scene().get_virtual_port(parent_port_id)
+        else:
+            parent_port = graphics_port.parent_port()
 
         if parent_port:
             port_layout = parent_port.child_ports_layout()
@@ -147,16 +148,30 @@ class GraphicsNode(QGraphicsItem):
 
         port_layout.add_item(graphics_port)
 
-        self._graphics_ports.append(graphics_port.uuid())
+        self._graphics_ports.add(graphics_port)
 
         logger.debug("Registered graphics port %s.", graphics_port.uuid())
 
+    def graphics_ports(self) -> Set[GraphicsPort]:
+        """Return the graphics ports of this node, nested ones included."""
+        return self._graphics_ports
+
     def unregister_graphics_port(self, graphics_port: GraphicsPortLike) -> None:
         graphics_port = self._graphics_state.get_graphics_port(graphics_port)
-        self._graphics_ports.remove(graphics_port.uuid())
+        self._graphics_ports.remove(graphics_port)
         graphics_port.parentItem().remove_item(graphics_port)
         logger.debug("Unregistered graphics port %s.", graphics_port.uuid())
 
+    def invalidate_connections(self) -> None:
+        """Invalidate the geometry of every connection attached to this node."""
+        # The ports are looked up instead of the node, the input and output
+        # nodes of a graph aren't in the graphics state but their ports are.
+        for graphics_port in self._graphics_ports:
+            for graphics_connection in self._graphics_state.port_graphics_connections(
+                graphics_port
+            ):
+                graphics_connection.invalidate_geometry()
+
     def boundingRect(self) -> QRectF:
         return QRectF(
             0,
@@ -165,64 +180,41 @@ class GraphicsNode(QGraphicsItem):
             self.height(),
         )
 
+    @profiled_paint
     def paint(
         self,
         painter: QPainter,
-        option: QStyleOptionGraphicsItem,  # pylint: disable=unused-argument
+        option: QStyleOptionGraphicsItem,
         widget: Optional[QWidget],  # pylint: disable=unused-argument
     ) -> None:
 
-        # Outline
-        path_outline = QPainterPath()
-        path_outline.addRoundedRect(
-            0,
-            0,
-            self.width(),
-            self.height(),
-            self._corner_radius,
-            self._corner_radius,
-        )
-        painter.setClipPath(path_outline)
+        theme = self._graphics_state.theme()
 
-        # Header
-        path_header = QPainterPath()
-        path_header.setFillRule(Qt.WindingFill)
-        path_header.addRoundedRect(
-            0,
-            0,
-            self.width(),
-            self._header_height,
-            self._corner_radius,
-            self._corner_radius,
-        )
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(self._header_brush)
-        painter.drawPath(path_header.simplified())
+        lod = level_of_detail(painter, option)
+        if lod < self._graphics_state.level_of_detail().node_shape:
+            brush = (
+                theme.node_background_brush
+                if not self.isSelected()
+                else theme.node_selected_pen.brush()
+            )
+            painter.fillRect(self.boundingRect(), brush)
+            return
 
-        # Body
-        path_body = QPainterPath()
-        path_body.addRect(
-            0,
-            self._header_height / 2,
-            self.width(),
-            self.height() - self._header_height / 2,
-        )
         painter.setPen(Qt.NoPen)
-        painter.setBrush(self._background_brush)
-        painter.drawPath(path_body.simplified())
-
-        # Outline
-        outline_pen = (
-            self._outline_pen_default
-            if not self.isSelected()
-            else self._outline_pen_selected
-        )
-        painter.setPen(outline_pen)
-        painter.setBrush(Qt.NoBrush)
-        painter.drawPath(path_outline.simplified())
+        painter.setBrush(theme.node_header_brush)
+        painter.drawPath(self._shapes.header)
+        painter.setBrush(theme.node_background_brush)
+        painter.drawPath(self._shapes.body)
+
+        if self.isSelected():
+            # Only the inner half of the outline is drawn.
+            painter.setClipPath(self._shapes.outline)
+            painter.setPen(theme.node_selected_pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(self._shapes.outline)
 
     def closest_grid_position(self, point: QPointF) -> QPointF:
-        grid_size = self.scene()._square_size
+        grid_size = self.scene().square_size()
         adjusted_x = floor(point.x() / grid_size) * grid_size
         adjusted_y = floor(point.y() / grid_size) * grid_size
         return QPointF(adjusted_x, adjusted_y)
@@ -230,6 +222,11 @@ class GraphicsNode(QGraphicsItem):
     def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value: Any) -> Any:
         if change == QGraphicsItem.ItemPositionChange and self.scene():
             return self.closest_grid_position(value)
+        if change == QGraphicsItem.ItemScenePositionHasChanged:
+            self.invalidate_connections()
+            scene = self.scene()
+            if scene is not None:
+                scene.socket_index().invalidate(self._graphics_ports)
         return super().itemChange(change, value)
 
 
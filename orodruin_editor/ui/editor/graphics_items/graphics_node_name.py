@@ -2,17 +2,12 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Optional
 
-import orodruin.commands
-from PySide2.QtCore import QRect, QRectF, Qt
-from PySide2.QtGui import QFont, QPainter
-from PySide2.QtWidgets import (
-    QGraphicsItem,
-    QGraphicsProxyWidget,
-    QGraphicsTextItem,
-    QLineEdit,
-    QStyleOptionGraphicsItem,
-    QWidget,
-)
+from PySide2.QtCore import QPointF, QRectF
+from PySide2.QtGui import QPainter
+from PySide2.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
+
+from ..level_of_detail import level_of_detail
+from ..paint_profiler import profiled_paint
 
 if TYPE_CHECKING:
     from ..graphics_state import GraphicsState
@@ -33,77 +28,53 @@ class GraphicsNodeName(QGraphicsItem):
         self._name = name
         self._graphics_node = graphics_node
 
-        self._name_color = Qt.white
-        self._name_font_family = "Roboto"
-        self._name_font_size = 10
-        self._name_font = QFont(self._name_font_family, self._name_font_size)
-
-        self._name_item = QGraphicsTextItem(self._name)
-        self._name_item.setParentItem(self)
-        self._name_item.setFont(self._name_font)
-        self._name_item.setDefaultTextColor(self._name_color)
-        self._name_item.setPos(0, -self._name_item.boundingRect().height())
-
-        self._proxy_widget = QGraphicsProxyWidget(self)
-        self._line_edit = QLineEdit(self._graphics_node.name())
-        self._line_edit.editingFinished.connect(self.end_rename)
-        self._line_edit.setGeometry(
-            QRect(
-                0,
-                0,
-                self._graphics_node.width(),
-                20,  # arbitrary value that worked
-            )
-        )
-
-        self._proxy_widget.setWidget(self._line_edit)
-        self._proxy_widget.moveBy(0, -self._proxy_widget.boundingRect().height())
-        self._proxy_widget.hide()
+        self._text_margin = 4
+        self._update_name_text()
 
     def init_rename(self):
         """Init the rename process"""
-        self._line_edit.setText(self.name())
-        self._line_edit.selectAll()
-        self._line_edit.setFocus()
-        self._proxy_widget.show()
-
-    def end_rename(self):
-        """End the rename process"""
-        self._proxy_widget.hide()
-        if not self._line_edit.isModified():
-            return
-
-        # Qt sends the editingFinished signal twice.
-        # Setting the line_edit as modified prevents anything to run the 2nd time.
-        self._line_edit.setModified(False)
-
-        new_name = self._line_edit.text()
-        orodruin.commands.RenameNode(
-            self._graphics_state.state(),
-            self._graphics_node.uuid(),
-            new_name,
-        ).do()
+        self._graphics_state.view().rename_editor().init_rename(self._graphics_node)
 
     def name(self) -> str:
         return self._name
 
     def set_name(self, name: str) -> None:
+        self.prepareGeometryChange()
         self._name = name
-        self._name_item.setPlainText(name)
+        self._update_name_text()
 
-    def boundingRect(self) -> QRectF:
-        name_bounding_rect = self._name_item.boundingRect()
-        return QRectF(
+    def _update_name_text(self) -> None:
+        self._name_text = self._graphics_state.text_cache().static_text(
+            self._name, self._graphics_state.theme().label_font
+        )
+        text_size = self._name_text.size()
+        # The name sits above the node, with a margin around the text.
+        self._bounding_rect = QRectF(
             0,
-            -name_bounding_rect.height(),
-            name_bounding_rect.width(),
-            name_bounding_rect.height(),
+            -text_size.height() - 2 * self._text_margin,
+            text_size.width() + 2 * self._text_margin,
+            text_size.height() + 2 * self._text_margin,
         )
 
+    def boundingRect(self) -> QRectF:
+        return self._bounding_rect
+
+    @profiled_paint
     def paint(
         self,
         painter: QPainter,
-        option: QStyleOptionGraphicsItem,  # pylint: disable=unused-argument
+        option: QStyleOptionGraphicsItem,
         widget: Optional[QWidget],  # pylint: disable=unused-argument
     ) -> None:
-        return
+        lod = level_of_detail(painter, option)
+        if lod < self._graphics_state.level_of_detail().text:
+            return
+
+        theme = self._graphics_state.theme()
+        painter.setPen(theme.label_color)
+        painter.setFont(theme.label_font)
+        painter.drawStaticText(
+            self._bounding_rect.topLeft()
+            + QPointF(self._text_margin, self._text_margin),
+            self._name_text,
+        )
@@ -1,31 +1,30 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Any, List, Optional, Union
 from uuid import UUID
 
 import attr
 from orodruin.core import PortDirection, PortType
 from orodruin.core.port.port import Port, PortLike
-from PySide2.QtCore import QPointF, QRect, QRectF, Qt
-from PySide2.QtGui import QColor, QFont, QPainter
-from PySide2.QtWidgets import (
-    QGraphicsItem,
-    QGraphicsTextItem,
-    QStyleOptionGraphicsItem,
-    QWidget,
-)
+from PySide2.QtCore import QPointF, QRectF
+from PySide2.QtGui import QPainter, QStaticText
+from PySide2.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
 
 from orodruin_editor.ui.editor.graphics_items.graphics_socket import GraphicsSocket
 from orodruin_editor.ui.editor.graphics_layouts import (
     LayoutItem,
     VerticalGraphicsLayout,
 )
+from orodruin_editor.ui.editor.level_of_detail import level_of_detail
+from orodruin_editor.ui.editor.paint_profiler import profiled_paint
 
 if TYPE_CHECKING:
     from ..graphics_state import GraphicsState
+    from ..socket_index import SocketIndex
+    from .graphics_connection import GraphicsConnection
 
 
-@attr.s
+@attr.s(eq=False)
 class GraphicsPort(LayoutItem):
 
     _graphics_state: GraphicsState = attr.ib()
@@ -42,15 +41,13 @@ class GraphicsPort(LayoutItem):
     _horizontal_text_padding: int = attr.ib(init=False, default=15)
     _port_offset: int = attr.ib(init=False, default=0)
 
-    _name_color: QColor = attr.ib(init=False)
-    _name_font_family: str = attr.ib(init=False, default="Roboto")
-    _name_font_size: int = attr.ib(init=False, default=10)
-    _name_font: QFont = attr.ib(init=False)
+    _name_text: QStaticText = attr.ib(init=False)
+    _name_position: QPointF = attr.ib(init=False)
 
     _graphics_socket: GraphicsSocket = attr.ib(init=False)
-    _name_item: QGraphicsTextItem = attr.ib(init=False)
 
     _child_ports_layout: VerticalGraphicsLayout = attr.ib(init=False)
+    _effective_rect: QRectF = attr.ib(init=False)
 
     @classmethod
     def from_port(
@@ -63,61 +60,54 @@ class GraphicsPort(LayoutItem):
             parent_port_id = port.parent_port().uuid()
         else:
             parent_port_id = None
-        graphics_port = cls(
+        return cls(
             graphics_state,
             port.uuid(),
             port.name(),
             port.direction(),
             port.type(),
             parent_port_id,
-            parent,
+            parent=parent,
         )
-        port.name_changed.subscribe(graphics_port.set_name)
-        return graphics_port
 
     def __attrs_post_init__(
         self,
     ) -> None:
         super().__init__(parent=self._parent)
 
+        self.setFlag(QGraphicsItem.ItemSendsGeometryChanges)
+
         self._graphics_socket = GraphicsSocket(self)
         self._graphics_socket.moveBy(
             self.socket_position().x(), self.socket_position().y()
         )
 
-        self._create_name_item()
+        self._update_name_text()
+
+        self._effective_rect = QRectF(0, 0, self.width(), self.height())
 
         self._child_ports_layout = VerticalGraphicsLayout(self)
         self._child_ports_layout.setPos(0, self._height)
         self._child_ports_layout.hide()
 
-    def _create_name_item(self) -> None:
-        self._name_color = Qt.white
-        self._name_font = QFont(self._name_font_family, self._name_font_size)
-
-        self._name_item = QGraphicsTextItem(self._name)
-        self._name_item.setParentItem(self)
-
-        self._name_item.setFont(self._name_font)
-        self._name_item.setDefaultTextColor(self._name_color)
+    def _update_name_text(self) -> None:
+        self._name_text = self._graphics_state.text_cache().static_text(
+            self._name, self._graphics_state.theme().label_font
+        )
 
         padding = (
             self._horizontal_text_padding
             if not self._parent_port_id
             else self._horizontal_text_padding * 2
         )
+        text_size = self._name_text.size()
         horizontal_offset = (
             self._port_offset + padding
             if self.direction() is PortDirection.input
-            else self.width()
-            - self._name_item.boundingRect().width()
-            - padding
-            - self._port_offset
+            else self.width() - text_size.width() - padding - self._port_offset
         )
-        self._name_item.setPos(
-            horizontal_offset,
-            0
-            # -2 + self._name_font.pointSize() / 2.0 + self.height() / 2,
+        self._name_position = QPointF(
+            horizontal_offset, (self.height() - text_size.height()) / 2
         )
 
     def uuid(self) -> UUID:
@@ -130,7 +120,8 @@ class GraphicsPort(LayoutItem):
     def set_name(self, name: str) -> None:
         """Set the name of the graphics port."""
         self._name = name
-        self._name_item.setPlainText(name)
+        self._update_name_text()
+        self.update()
 
     def direction(self) -> PortDirection:
         """Return the direction of the graphics port."""
@@ -140,6 +131,9 @@ class GraphicsPort(LayoutItem):
         """Return the type of the graphics port."""
         return self._port_type
 
+    def graphics_state(self) -> GraphicsState:
+        return self._graphics_state
+
     def is_virtual(self) -> bool:
         return self._is_virtual
 
@@ -149,6 +143,9 @@ class GraphicsPort(LayoutItem):
     def height(self) -> int:
         return self._height
 
+    def parent_port_id(self) -> Optional[UUID]:
+        return self._parent_port_id
+
     def parent_port(self) -> Optional[GraphicsPort]:
         if self._parent_port_id:
             return self._graphics_state.get_graphics_port(self._parent_port_id)
@@ -160,6 +157,41 @@ class GraphicsPort(LayoutItem):
     def child_ports_layout(self) -> VerticalGraphicsLayout:
         return self._child_ports_layout
 
+    def is_expanded(self) -> bool:
+        """Return whether the child ports of this port are shown."""
+        return self._child_ports_layout.isVisibleTo(self)
+
+    def set_expanded(self, expanded: bool) -> None:
+        """Show or hide the child ports of this port."""
+        self._child_ports_layout.setVisible(expanded)
+
+    def graphics_connections(self) -> List[GraphicsConnection]:
+        """Return the graphics connections attached to this graphics port."""
+        return self._graphics_state.port_graphics_connections(self)
+
+    def invalidate_connections(self) -> None:
+        """Invalidate the geometry of the connections of this port and its children."""
+        for graphics_connection in self.graphics_connections():
+            graphics_connection.invalidate_geometry()
+        for child_port in self._child_ports_layout.childItems():
+            child_port.invalidate_connections()
+
+    def socket_index(self) -> Optional[SocketIndex]:
+        """Return the socket index of the scene this port is in."""
+        scene = self.scene()
+        if scene is None:
+            return None
+        return scene.socket_index()
+
+    def invalidate_socket(self) -> None:
+        """Mark the socket of this port and its children as moved in the index."""
+        socket_index = self.socket_index()
+        if socket_index is None:
+            return
+        socket_index.invalidate([self])
+        for child_port in self._child_ports_layout.childItems():
+            child_port.invalidate_socket()
+
     def socket_position(self) -> QPointF:
         """Local position of the Port's socket"""
         horizontal_offset = (
@@ -176,12 +208,20 @@ class GraphicsPort(LayoutItem):
         """Global position of the Port's socket, used to attach Connections to."""
         return self.scenePos() + self.socket_position()
 
-    def effective_bounding_rect(self) -> QRectF:
-        width = self.width()
+    def relayout(self) -> bool:
         height = (
             self._height + self._child_ports_layout.effective_bounding_rect().height()
         )
-        return QRect(0, 0, width, height)
+        effective_rect = QRectF(0, 0, self.width(), height)
+
+        if effective_rect == self._effective_rect:
+            return False
+
+        self._effective_rect = effective_rect
+        return True
+
+    def effective_bounding_rect(self) -> QRectF:
+        return self._effective_rect
 
     def boundingRect(self) -> QRectF:
         return QRectF(
@@ -191,13 +231,36 @@ class GraphicsPort(LayoutItem):
             self.height(),
         )
 
+    @profiled_paint
     def paint(
         self,
         painter: QPainter,
-        option: QStyleOptionGraphicsItem,  # pylint: disable=unused-argument
+        option: QStyleOptionGraphicsItem,
         widget: Optional[QWidget],  # pylint: disable=unused-argument
     ) -> None:
-        return
+        lod = level_of_detail(painter, option)
+        if lod < self._graphics_state.level_of_detail().text:
+            return
+
+        theme = self._graphics_state.theme()
+        painter.setPen(theme.label_color)
+        painter.setFont(theme.label_font)
+        painter.drawStaticText(self._name_position, self._name_text)
+
+    def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value: Any) -> Any:
+        # The parent layout moved this port within its node.
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            self.invalidate_connections()
+            self.invalidate_socket()
+        elif change == QGraphicsItem.ItemSceneChange:
+            socket_index = self.socket_index()
+            if socket_index is not None:
+                socket_index.remove(self)
+        elif change == QGraphicsItem.ItemSceneHasChanged:
+            socket_index = self.socket_index()
+            if socket_index is not None:
+                socket_index.add(self)
+        return super().itemChange(change, value)
 
 
 GraphicsPortLike = Union[GraphicsPort, PortLike]
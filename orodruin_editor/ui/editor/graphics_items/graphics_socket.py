@@ -1,35 +1,23 @@
 from __future__ import annotations
 
-from enum import Enum
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
 import attr
 from orodruin.core.port.port import PortDirection
-from PySide2.QtCore import QRectF, Qt
-from PySide2.QtGui import QBrush, QColor, QPainter, QPen
+from PySide2.QtCore import QRectF
+from PySide2.QtGui import QColor, QPainter
 from PySide2.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
 
+from ..level_of_detail import level_of_detail
+from ..paint_profiler import profiled_paint
+from ..theme import PortStyle
+
 if TYPE_CHECKING:
     from .graphics_port import GraphicsPort
 
 
-class PortColor(Enum):
-    """A Mapping between the port type and port colors."""
-
-    Reference = QColor("#f0c674")
-    Matrix3 = QColor("#cc6666")
-    Matrix4 = QColor("#cc6666")
-    Vector2 = QColor("#b5bd68")
-    Vector3 = QColor("#b5bd68")
-    Quaternion = QColor("#b294bb")
-    bool = QColor("#de935f")
-    float = QColor("#8abeb7")
-    int = QColor("#81a2be")
-    str = QColor("#f0c674")
-
-
-@attr.s
+@attr.s(eq=False)
 class GraphicsSocket(QGraphicsItem):
     """Graphical representation of a Socket
 
@@ -39,22 +27,10 @@ class GraphicsSocket(QGraphicsItem):
     _graphics_port: GraphicsPort = attr.ib()
 
     _radius: int = attr.ib(init=False, default=6)
-    _color_outline: QColor = attr.ib(init=False)
-    _color_background: QColor = attr.ib(init=False)
-
-    _pen: QPen = attr.ib(init=False)
-    _brush: QBrush = attr.ib(init=False)
 
     def __attrs_post_init__(self) -> None:
         super().__init__(parent=self._graphics_port)
 
-        self._color_outline = QColor("#101010")
-        self._color_background = QColor(Qt.white)
-
-        self._pen = QPen(self._color_outline)
-        self._pen.setWidth(2)
-        self._brush = QBrush(self.color())
-
     def graphics_port(self) -> GraphicsPort:
         """Return this Graphics Socket's Graphics Port"""
         return self._graphics_port
@@ -67,14 +43,14 @@ class GraphicsSocket(QGraphicsItem):
         """Return this Graphics Socket's UUID"""
         return self._graphics_port.uuid()
 
+    def port_style(self) -> PortStyle:
+        """Style of the Socket's port type"""
+        theme = self._graphics_port.graphics_state().theme()
+        return theme.port_style(self._graphics_port.type())
+
     def color(self) -> QColor:
         """Color the Socket should have"""
-        port_type = self._graphics_port.type()
-        try:
-            color = PortColor[port_type.__name__].value
-        except:
-            color = Qt.lightGray
-        return color
+        return self.port_style().color
 
     def boundingRect(self) -> QRectF:
         # return a bigger bounding rect than the visual socket
@@ -86,14 +62,21 @@ class GraphicsSocket(QGraphicsItem):
             2 * self._radius * 2,
         )
 
+    @profiled_paint
     def paint(
         self,
         painter: QPainter,
-        option: QStyleOptionGraphicsItem,  # pylint: disable=unused-argument
+        option: QStyleOptionGraphicsItem,
         widget: Optional[QWidget],  # pylint: disable=unused-argument
     ) -> None:
-        painter.setPen(self._pen)
-        painter.setBrush(self._brush)
+        graphics_state = self._graphics_port.graphics_state()
+        lod = level_of_detail(painter, option)
+        if lod < graphics_state.level_of_detail().socket:
+            return
+
+        theme = graphics_state.theme()
+        painter.setPen(theme.socket_pen)
+        painter.setBrush(theme.port_style(self._graphics_port.type()).socket_brush)
         painter.drawEllipse(
             -self._radius,
             -self._radius,
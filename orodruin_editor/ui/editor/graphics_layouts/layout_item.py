@@ -6,3 +6,22 @@ class LayoutItem(QGraphicsItem):
     def effective_bounding_rect(self) -> QRectF:
         """The bounding rect used by the parent layout to position its items."""
         return self.boundingRect()
+
+    def relayout(self) -> bool:
+        """Recompute the cached extent of this item.
+
+        Return whether the effective bounding rect changed.
+        """
+        return True
+
+    def update_geometry(self) -> None:
+        """Relayout this item and the ancestors whose extent depends on it.
+
+        The walk stops at the first ancestor whose extent didn't change.
+        """
+        if not self.relayout():
+            return
+
+        update_parent_geometry = getattr(self.parentItem(), "update_geometry", None)
+        if update_parent_geometry:
+            update_parent_geometry()
@@ -1,22 +1,26 @@
 from __future__ import annotations
 
 import random
-from typing import List, Optional
+from typing import Any, List, Optional
 
 import attr
 from PySide2.QtCore import QRectF, Qt
 from PySide2.QtGui import QBrush, QPainter
 from PySide2.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
 
+from ..paint_profiler import profiled_paint
 from .layout_item import LayoutItem
 
 
-@attr.s
+@attr.s(eq=False)
 class VerticalGraphicsLayout(LayoutItem):
     _parent: Optional[QGraphicsItem] = attr.ib(default=None)
 
     _children: List[LayoutItem] = attr.ib(init=False, factory=list)
 
+    _width: int = attr.ib(init=False, default=150)
+    _extent: QRectF = attr.ib(init=False, factory=QRectF)
+
     def __attrs_post_init__(self) -> None:
         super().__init__(parent=self._parent)
 
@@ -26,39 +30,55 @@ class VerticalGraphicsLayout(LayoutItem):
     def add_item(self, item: LayoutItem):
         self._children.append(item)
         item.setParentItem(self)
-        self.reorder_children()
+        self.update_geometry()
 
     def remove_item(self, item: LayoutItem):
         self._children.remove(item)
+        self.update_geometry()
 
-    def reorder_children(self):
+    def reorder_children(self) -> float:
+        """Stack the children vertically and return their total height."""
         y = 0
         for child in self._children:
             _y = y if child.isVisible() else 0
             child.setPos(0, _y)
             y += child.effective_bounding_rect().height()
+        return y
 
-    def effective_bounding_rect(self) -> QRectF:
+    def relayout(self) -> bool:
+        height = self.reorder_children()
         if self.isVisible():
-            width = 150
-            height = 0
-            for child in self.childItems():
-                height += child.effective_bounding_rect().height()
-            return QRectF(0, 0, width, height)
+            extent = QRectF(0, 0, self._width, height)
         else:
-            return QRectF(0, 0, 0, 0)
+            extent = QRectF(0, 0, 0, 0)
+
+        if extent == self._extent:
+            return False
+
+        self.prepareGeometryChange()
+        self._extent = extent
+        return True
+
+    def effective_bounding_rect(self) -> QRectF:
+        return self._extent
 
     def boundingRect(self) -> QRectF:
-        return self.effective_bounding_rect()
+        return self._extent
 
+    @profiled_paint
     def paint(
         self,
         painter: QPainter,
         option: QStyleOptionGraphicsItem,  # pylint: disable=unused-argument
         widget: Optional[QWidget],  # pylint: disable=unused-argument
     ) -> None:
-        self.reorder_children()
-
         # painter.setPen(Qt.NoPen)
         # painter.setBrush(QBrush(self._color))
         # painter.drawRect(self.boundingRect())
+        return
+
+    def itemChange(self, change: QGraphicsItem.GraphicsItemChange, value: Any) -> Any:
+        # Showing or hiding the layout changes the extent of every parent item.
+        if change == QGraphicsItem.ItemVisibleHasChanged:
+            self.update_geometry()
+        return super().itemChange(change, value)
@@ -1,22 +1,44 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Dict, List
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from math import ceil, floor, sqrt
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 from uuid import UUID
 
 import attr
 from orodruin.core import Connection, Graph, Node, Port, State
 from orodruin.core.signal import Signal
+from PySide2.QtCore import QPointF
+from PySide2.QtWidgets import QGraphicsItem, QGraphicsScene
 
 from orodruin_editor.core import EditorDeserializer, EditorSerializer
+from orodruin_editor.core.tracing import traced
 
 from .graphics_graph import GraphicsGraph, GraphicsGraphLike
+from .graphics_graph_record import GraphicsGraphRecord
 from .graphics_items.graphics_connection import (
     GraphicsConnection,
     GraphicsConnectionLike,
 )
 from .graphics_items.graphics_node import GraphicsNode, GraphicsNodeLike
 from .graphics_items.graphics_port import GraphicsPort, GraphicsPortLike
+from .level_of_detail import LevelOfDetail
+from .shape_cache import ShapeCache
+from .text_cache import TextCache
+from .theme import Theme
 
 logger = logging.getLogger(__name__)
 
@@ -31,16 +53,47 @@ class GraphicsState:
     _view: GraphicsView = attr.ib()
 
     selection_changed: Signal[List[UUID]] = attr.ib(init=False, factory=Signal)
+    _level_of_detail: LevelOfDetail = attr.ib(init=False, factory=LevelOfDetail)
     _active_graph: GraphicsGraph = attr.ib(init=False)
-    _root_graph: GraphicsGraph = attr.ib(init=False)
 
-    _graphics_graphs: Dict[UUID, GraphicsGraph] = attr.ib(init=False, factory=dict)
+    _text_cache: TextCache = attr.ib(init=False, factory=TextCache)
+    _shape_cache: ShapeCache = attr.ib(init=False, factory=ShapeCache)
+    _theme: Theme = attr.ib(init=False, factory=Theme)
+
+    _graphics_graphs: Dict[UUID, GraphicsGraphRecord] = attr.ib(
+        init=False, factory=dict
+    )
     _graphics_nodes: Dict[UUID, GraphicsNode] = attr.ib(init=False, factory=dict)
     _graphics_ports: Dict[UUID, GraphicsPort] = attr.ib(init=False, factory=dict)
     _graphics_connections: Dict[UUID, GraphicsConnection] = attr.ib(
         init=False, factory=dict
     )
 
+    # State of the nodes whose graphics node isn't built yet.
+    _node_positions: Dict[UUID, QPointF] = attr.ib(init=False, factory=dict)
+    # Ports of each node in registration order, and the node of each port.
+    _node_ports: Dict[UUID, Dict[UUID, None]] = attr.ib(init=False, factory=dict)
+    _port_nodes: Dict[UUID, UUID] = attr.ib(init=False, factory=dict)
+    # Connections attached to each port, whether they are built or not.
+    _port_connections: Dict[UUID, Dict[UUID, None]] = attr.ib(init=False, factory=dict)
+    _expanded_ports: Set[UUID] = attr.ib(init=False, factory=set)
+
+    # Built scenes, least recently used first.
+    _graphics_graph_cache: OrderedDict[UUID, GraphicsGraphRecord] = attr.ib(
+        init=False, factory=OrderedDict
+    )
+    _graphics_graph_item_budget: int = attr.ib(init=False, default=20000)
+    _graphics_graph_cache_hits: int = attr.ib(init=False, default=0)
+    _graphics_graph_cache_misses: int = attr.ib(init=False, default=0)
+    _graphics_graph_cache_evictions: int = attr.ib(init=False, default=0)
+
+    _batch_depth: int = attr.ib(init=False, default=0)
+    # Rebuilding the index of a scene only pays off for large batches.
+    _batch_index_threshold: int = attr.ib(init=False, default=500)
+    _batched_operations: List[Tuple[GraphicsGraph, Callable[[], None]]] = attr.ib(
+        init=False, factory=list
+    )
+
     def __attrs_post_init__(self) -> None:
         self._state.graph_created.subscribe(self.create_graphics_graph)
         self._state.graph_deleted.subscribe(self.delete_graphics_graph)
@@ -51,8 +104,8 @@ class GraphicsState:
         self._state.connection_created.subscribe(self.create_graphics_connection)
         self._state.connection_deleted.subscribe(self.delete_graphics_connection)
 
-        self._root_graph = self.create_graphics_graph(self._state.root_graph())
-        self.set_active_graph(self._root_graph)
+        self.create_graphics_graph(self._state.root_graph())
+        self.set_active_graph(self._state.root_graph())
 
         deserializer = EditorDeserializer(self)
         serializer = EditorSerializer(self)
@@ -62,64 +115,271 @@ class GraphicsState:
     def state(self) -> State:
         return self._state
 
+    def view(self) -> GraphicsView:
+        return self._view
+
+    def level_of_detail(self) -> LevelOfDetail:
+        """Return the zoom thresholds used to simplify the graphics items."""
+        return self._level_of_detail
+
+    def set_level_of_detail(self, level_of_detail: LevelOfDetail) -> None:
+        """Set the zoom thresholds used to simplify the graphics items."""
+        self._level_of_detail = level_of_detail
+        self._view.viewport().update()
+
+    def text_cache(self) -> TextCache:
+        """Return the cache of the texts the item labels are drawn with."""
+        return self._text_cache
+
+    def shape_cache(self) -> ShapeCache:
+        """Return the cache of the shapes the node bodies are drawn with."""
+        return self._shape_cache
+
+    def theme(self) -> Theme:
+        """Return the colors, pens, brushes and fonts shared by the items."""
+        return self._theme
+
+    def set_theme(self, theme: Theme) -> None:
+        """Restyle the built graphics items with the given theme."""
+        self._theme = theme
+        # Labels and connection pens derive from the theme, refresh them.
+        for graphics_node in self._graphics_nodes.values():
+            graphics_node.set_name(graphics_node.name())
+        for graphics_port in self._graphics_ports.values():
+            graphics_port.set_name(graphics_port.name())
+        # The input and output nodes of the built scenes aren't in the state.
+        for record in self._graphics_graph_cache.values():
+            if not record.is_materialized():
+                continue
+            graphics_graph = record.graphics_graph()
+            for graphics_node in (
+                graphics_graph.input_graphics_node(),
+                graphics_graph.output_graphics_node(),
+            ):
+                if graphics_node is not None:
+                    graphics_node.set_name(graphics_node.name())
+            for graphics_port in graphics_graph.virtual_graphics_ports():
+                graphics_port.set_name(graphics_port.name())
+        for graphics_connection in self._graphics_connections.values():
+            graphics_connection.invalidate_geometry()
+        self._view.viewport().update()
+
     def set_active_graph(self, graph: GraphicsGraphLike) -> None:
         graph = self.get_graphics_graph(graph)
+        # The node being renamed isn't shown anymore.
+        self._view.rename_editor().cancel_rename()
         self._active_graph = graph
         self._view.setScene(self._active_graph)
+        self._evict_graphics_graphs()
+
+    def cancel_node_rename(self, node: GraphicsNodeLike) -> None:
+        """Close the rename editor if it is renaming the given node."""
+        uuid = node.uuid() if not isinstance(node, UUID) else node
+        rename_editor = self._view.rename_editor()
+        if rename_editor.node_id() == uuid:
+            rename_editor.cancel_rename()
+
+    def graphics_graph_item_budget(self) -> int:
+        """Return the number of graph items the built scenes may hold in total."""
+        return self._graphics_graph_item_budget
+
+    def set_graphics_graph_item_budget(self, budget: int) -> None:
+        """Set the number of graph items the built scenes may hold in total.
+
+        Graph items are the nodes, ports and connections of the graphs. The
+        least recently used scenes are released once the budget is exceeded.
+        The active scene is never released.
+        """
+        self._graphics_graph_item_budget = budget
+        self._evict_graphics_graphs()
+
+    def graphics_graph_cache_stats(self) -> Dict[str, int]:
+        """Return the counters of the built scenes cache."""
+        return {
+            "scenes": len(self._graphics_graph_cache),
+            "hits": self._graphics_graph_cache_hits,
+            "misses": self._graphics_graph_cache_misses,
+            "evictions": self._graphics_graph_cache_evictions,
+        }
+
+    def _graphics_graph_from_record(self, record: GraphicsGraphRecord) -> GraphicsGraph:
+        if record.is_materialized():
+            self._graphics_graph_cache_hits += 1
+        else:
+            self._graphics_graph_cache_misses += 1
+        graphics_graph = record.graphics_graph()
+
+        self._graphics_graph_cache[record.uuid()] = record
+        self._graphics_graph_cache.move_to_end(record.uuid())
+        return graphics_graph
+
+    def _evict_graphics_graphs(self) -> None:
+        if self._batch_depth:
+            return
+
+        item_count = sum(
+            record.item_count() for record in self._graphics_graph_cache.values()
+        )
+
+        for uuid in list(self._graphics_graph_cache):
+            if item_count <= self._graphics_graph_item_budget:
+                break
+            if uuid == self._active_graph.uuid():
+                continue
+
+            record = self._graphics_graph_cache.pop(uuid)
+            record.release_graphics_graph()
+            item_count -= record.item_count()
+            self._graphics_graph_cache_evictions += 1
 
     def active_graph(self) -> GraphicsGraph:
         return self._active_graph
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer the scene operations of a bulk operation and apply them at once.
+
+        Graphics items are still created as the orodruin signals are emitted
+        so they can be looked up during the operation, but adding them to or
+        removing them from their scenes is queued until the outermost batch
+        exits. The scenes are then updated in one pass and the view is repainted
+        once. The index of a scene receiving many operations is suspended
+        during the pass.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._apply_batched_operations()
+
+    def is_batching(self) -> bool:
+        """Return whether scene operations are currently deferred."""
+        return self._batch_depth > 0
+
+    def defer(
+        self, graphics_graph: GraphicsGraph, operation: Callable[[], None]
+    ) -> None:
+        """Run a scene operation now, or at the end of the current batch."""
+        if self._batch_depth:
+            self._batched_operations.append((graphics_graph, operation))
+        else:
+            operation()
+
+    @traced("editor")
+    def _apply_batched_operations(self) -> None:
+        operations = self._batched_operations
+        self._batched_operations = []
+        if not operations:
+            return
+
+        operation_counts: Counter = Counter(
+            graphics_graph for graphics_graph, _ in operations
+        )
+        unindexed_graphics_graphs = [
+            graphics_graph
+            for graphics_graph, count in operation_counts.items()
+            if count >= self._batch_index_threshold
+        ]
+        for graphics_graph in unindexed_graphics_graphs:
+            graphics_graph.setItemIndexMethod(QGraphicsScene.NoIndex)
+
+        viewport = self._view.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            for _, operation in operations:
+                operation()
+        finally:
+            for graphics_graph in unindexed_graphics_graphs:
+                graphics_graph.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+            viewport.setUpdatesEnabled(True)
+            viewport.update()
+
+        logger.debug(
+            "Applied %s batched operations on %s graphics graphs.",
+            len(operations),
+            len(operation_counts),
+        )
+
     def get_graphics_graph(self, graph: GraphicsGraphLike) -> GraphicsGraph:
-        """Return a registered graphics graph from a GraphicsGraphLike object."""
+        """Return a registered graphics graph from a GraphicsGraphLike object.
+
+        The scene of the graph is built the first time it is requested.
+        """
         if isinstance(graph, UUID):
-            graphics_graph = self._graphics_graphs[graph]
+            record = self._graphics_graphs[graph]
+            graphics_graph = self._graphics_graph_from_record(record)
         elif isinstance(graph, Graph):
-            graphics_graph = self._graphics_graphs[graph.uuid()]
+            record = self._graphics_graphs[graph.uuid()]
+            graphics_graph = self._graphics_graph_from_record(record)
         elif isinstance(graph, GraphicsGraph):
             graphics_graph = graph
+        else:
+            raise TypeError
 
         return graphics_graph
 
     def get_graphics_node(self, node: GraphicsNodeLike) -> GraphicsNode:
-        """Return a registered graphics node from a GraphicsNodeLike object."""
+        """Return a registered graphics node from a GraphicsNodeLike object.
+
+        The graphics node is built the first time it is requested.
+        """
         if isinstance(node, UUID):
-            graphics_node = self._graphics_nodes[node]
+            uuid = node
         elif isinstance(node, Node):
-            graphics_node = self._graphics_nodes[node.uuid()]
+            uuid = node.uuid()
         elif isinstance(node, GraphicsNode):
-            graphics_node = node
+            return node
         else:
             raise TypeError
 
+        graphics_node = self._graphics_nodes.get(uuid)
+        if graphics_node is None:
+            graphics_node = self._build_graphics_node(uuid)
+
         return graphics_node
 
     def get_graphics_port(self, port: GraphicsPortLike) -> GraphicsPort:
-        """Return a registered graphics port from a GraphicsPortLike object."""
+        """Return a registered graphics port from a GraphicsPortLike object.
+
+        The graphics port is built the first time it is requested.
+        """
         if isinstance(port, UUID):
-            graphics_port = self._graphics_ports[port]
+            uuid = port
         elif isinstance(port, Port):
-            graphics_port = self._graphics_ports[port.uuid()]
+            uuid = port.uuid()
         elif isinstance(port, GraphicsPort):
-            graphics_port = port
+            return port
         else:
             raise TypeError
 
+        graphics_port = self._graphics_ports.get(uuid)
+        if graphics_port is None:
+            graphics_port = self._build_graphics_port(uuid)
+
         return graphics_port
 
     def get_graphics_connection(
         self, connection: GraphicsConnectionLike
-    ) -> GraphicsPort:
-        """Return a registered graphics connection from a GraphicsConnectionLike object."""
+    ) -> GraphicsConnection:
+        """Return a registered graphics connection from a GraphicsConnectionLike object.
+
+        The graphics connection is built the first time it is requested.
+        """
         if isinstance(connection, UUID):
-            graphics_connection = self._graphics_connections[connection]
+            uuid = connection
         elif isinstance(connection, Connection):
-            graphics_connection = self._graphics_connections[connection.uuid()]
+            uuid = connection.uuid()
         elif isinstance(connection, GraphicsConnection):
-            graphics_connection = connection
+            return connection
         else:
             raise TypeError
 
+        graphics_connection = self._graphics_connections.get(uuid)
+        if graphics_connection is None:
+            graphics_connection = self._build_graphics_connection(uuid)
+
         return graphics_connection
 
     def get_graph(self, graph: GraphicsGraphLike) -> Graph:
@@ -148,54 +408,372 @@ class GraphicsState:
 
         return node
 
-    def create_graphics_graph(self, graph: Graph) -> GraphicsGraph:
-        """Create a graphics graph and register it to the graphics state."""
-        graphics_graph = GraphicsGraph.from_graph(self, graph)
-        self._graphics_graphs[graph.uuid()] = graphics_graph
+    def node_ports(self, node: GraphicsNodeLike) -> List[UUID]:
+        """Return the UUIDs of the ports of a node, in registration order."""
+        uuid = node.uuid() if not isinstance(node, UUID) else node
+        return list(self._node_ports.get(uuid, ()))
+
+    def port_connections(self, port: GraphicsPortLike) -> List[UUID]:
+        """Return the UUIDs of the connections attached to a port."""
+        uuid = port.uuid() if not isinstance(port, UUID) else port
+        return list(self._port_connections.get(uuid, ()))
+
+    def node_connections(self, node: GraphicsNodeLike) -> List[UUID]:
+        """Return the UUIDs of the connections attached to the ports of a node."""
+        uuid = node.uuid() if not isinstance(node, UUID) else node
+        connection_ids: Dict[UUID, None] = {}
+        for port_id in self._node_ports.get(uuid, ()):
+            connection_ids.update(self._port_connections.get(port_id, ()))
+        return list(connection_ids)
+
+    def port_graphics_connections(
+        self, graphics_port: GraphicsPort
+    ) -> List[GraphicsConnection]:
+        """Return the built graphics connections drawn to a graphics port.
+
+        A virtual port shares the UUID of the port it mirrors, only the
+        connections drawn to the given item are returned.
+        """
+        graphics_connections = []
+        for connection_id in self._port_connections.get(graphics_port.uuid(), ()):
+            graphics_connection = self._graphics_connections.get(connection_id)
+            if graphics_connection is not None and (
+                graphics_connection.source_graphics_port() is graphics_port
+                or graphics_connection.target_graphics_port() is graphics_port
+            ):
+                graphics_connections.append(graphics_connection)
+        return graphics_connections
+
+    def node_position(self, node: GraphicsNodeLike) -> QPointF:
+        """Return the position of a node, whether its graphics node is built or not."""
+        uuid = node.uuid() if not isinstance(node, UUID) else node
+        graphics_node = self._graphics_nodes.get(uuid)
+        if graphics_node:
+            return graphics_node.pos()
+        return self._node_positions.get(uuid, QPointF())
+
+    def set_node_position(self, node: GraphicsNodeLike, position: QPointF) -> None:
+        """Set the position of a node, whether its graphics node is built or not."""
+        uuid = node.uuid() if not isinstance(node, UUID) else node
+        graphics_node = self._graphics_nodes.get(uuid)
+        if graphics_node:
+            graphics_node.setPos(position)
+        else:
+            self._node_positions[uuid] = position
+
+    def arrange_nodes_in_grid(
+        self,
+        nodes: Sequence[GraphicsNodeLike],
+        center: QPointF,
+        spacing: float = 50,
+    ) -> None:
+        """Lay out nodes in rows and columns centered on a point, without overlaps.
+
+        Rows are as tall as their tallest built node, the cells are rounded up
+        to the grid of the active graph.
+        """
+        if not nodes:
+            return
+
+        uuids = [node.uuid() if not isinstance(node, UUID) else node for node in nodes]
+        square_size = self._active_graph.square_size()
+
+        def snap_up(length: float) -> float:
+            return ceil(length / square_size) * square_size
+
+        column_count = ceil(sqrt(len(uuids)))
+        rows = [
+            uuids[index : index + column_count]
+            for index in range(0, len(uuids), column_count)
+        ]
+
+        column_width = 0.0
+        row_heights = []
+        for row in rows:
+            row_height = 0.0
+            for uuid in row:
+                graphics_node = self._graphics_nodes.get(uuid)
+                if graphics_node is None:
+                    continue
+                column_width = max(column_width, graphics_node.width())
+                row_height = max(row_height, graphics_node.height())
+            row_heights.append(snap_up(row_height + spacing))
+        column_width = snap_up(column_width + spacing)
+
+        left = center.x() - column_width * column_count / 2
+        top = center.y() - sum(row_heights) / 2
+        left = floor(left / square_size) * square_size
+        y = floor(top / square_size) * square_size
+        for row, row_height in zip(rows, row_heights):
+            for column, uuid in enumerate(row):
+                self.set_node_position(uuid, QPointF(left + column * column_width, y))
+            y += row_height
+
+    def _build_graphics_node(self, uuid: UUID) -> GraphicsNode:
+        node = self._state.get_node(uuid)
+        graphics_node = GraphicsNode.from_node(self, node)
+        graphics_node.setPos(self._node_positions.pop(uuid, QPointF()))
+        self._graphics_nodes[uuid] = graphics_node
+
+        for port_id in self._node_ports[uuid]:
+            graphics_node.register_graphics_port(port_id)
+
+        logger.debug("Built graphics node %s.", uuid)
+        return graphics_node
+
+    def _build_graphics_port(self, uuid: UUID) -> GraphicsPort:
+        # Graphics ports only exist within their graphics node.
+        # Building the node builds all of its ports.
+        node_id = self._port_nodes[uuid]
+        if node_id not in self._graphics_nodes:
+            self._build_graphics_node(node_id)
+            return self._graphics_ports[uuid]
+
+        port = self._state.get_port(uuid)
+        graphics_port = GraphicsPort.from_port(self, port)
+        self._graphics_ports[uuid] = graphics_port
+
+        if uuid in self._expanded_ports:
+            self._expanded_ports.remove(uuid)
+            graphics_port.set_expanded(True)
+
+        logger.debug("Built graphics port %s.", port.path())
+        return graphics_port
+
+    def _build_graphics_connection(self, uuid: UUID) -> GraphicsConnection:
+        connection = self._state.get_connection(uuid)
+        graphics_connection = GraphicsConnection.from_connection(self, connection)
+        self._graphics_connections[uuid] = graphics_connection
+
+        logger.debug("Built graphics connection %s.", uuid)
+        return graphics_connection
+
+    def release_graphics_node(self, uuid: UUID) -> None:
+        """Destroy a graphics node and its ports, keeping their editor state."""
+        graphics_node = self._graphics_nodes.pop(uuid, None)
+        if graphics_node is None:
+            return
+
+        # Lookups from other graphs build nodes that are in no scene.
+        scene = graphics_node.scene()
+        if scene is not None:
+            scene.removeItem(graphics_node)
+
+        self._node_positions[uuid] = graphics_node.pos()
+        for port_id in self._node_ports[uuid]:
+            graphics_port = self._graphics_ports.pop(port_id, None)
+            if graphics_port and graphics_port.is_expanded():
+                self._expanded_ports.add(port_id)
+
+    def remove_graphics_items(
+        self,
+        nodes: Iterable[GraphicsNodeLike],
+        connections: Iterable[GraphicsConnectionLike] = (),
+    ) -> None:
+        """Remove the graphics items of nodes and connections about to be deleted.
+
+        The closure of the deletion, the ports of the nodes and every connection
+        attached to them, is collected first. Their items are then unregistered
+        from the graphics state and removed from their scenes in one pass, and
+        the view is repainted once. The orodruin signals of the deletion find
+        nothing left to remove.
+        """
+        node_ids = [
+            node.uuid() if not isinstance(node, UUID) else node for node in nodes
+        ]
+        connection_ids: Dict[UUID, None] = {
+            connection.uuid() if not isinstance(connection, UUID) else connection: None
+            for connection in connections
+        }
+        for node_id in node_ids:
+            connection_ids.update(dict.fromkeys(self.node_connections(node_id)))
+
+        items: List[QGraphicsItem] = []
+        for connection_id in connection_ids:
+            graphics_connection = self._graphics_connections.pop(connection_id, None)
+            if graphics_connection is not None:
+                items.append(graphics_connection)
+        for node_id in node_ids:
+            graphics_node = self._graphics_nodes.pop(node_id, None)
+            if graphics_node is None:
+                continue
+            # Ports are child items of their node, removed with it.
+            for port_id in self._node_ports.get(node_id, ()):
+                self._graphics_ports.pop(port_id, None)
+            self._node_positions[node_id] = graphics_node.pos()
+            items.append(graphics_node)
+
+        scenes = {item.scene() for item in items} - {None}
+        suspend_index = len(items) >= self._batch_index_threshold
+        if suspend_index:
+            for scene in scenes:
+                scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        viewport = self._view.viewport()
+        viewport.setUpdatesEnabled(False)
+        try:
+            for item in items:
+                scene = item.scene()
+                if scene is not None:
+                    scene.removeItem(item)
+        finally:
+            if suspend_index:
+                for scene in scenes:
+                    scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+            viewport.setUpdatesEnabled(True)
+            viewport.update()
+
+        logger.debug(
+            "Removed the items of %s nodes and %s connections.",
+            len(node_ids),
+            len(connection_ids),
+        )
+
+    def built_graphics_node(self, node: GraphicsNodeLike) -> Optional[GraphicsNode]:
+        """Return the graphics node of a node if it is built, without building it."""
+        uuid = node.uuid() if not isinstance(node, UUID) else node
+        return self._graphics_nodes.get(uuid)
+
+    def built_graphics_port(self, port: GraphicsPortLike) -> Optional[GraphicsPort]:
+        """Return the graphics port of a port if it is built, without building it."""
+        uuid = port.uuid() if not isinstance(port, UUID) else port
+        return self._graphics_ports.get(uuid)
+
+    def built_graphics_connection(
+        self, connection: GraphicsConnectionLike
+    ) -> Optional[GraphicsConnection]:
+        """Return the graphics connection of a connection if it is built."""
+        uuid = connection.uuid() if not isinstance(connection, UUID) else connection
+        return self._graphics_connections.get(uuid)
+
+    def release_graphics_connection(self, uuid: UUID) -> None:
+        """Destroy a graphics connection."""
+        graphics_connection = self._graphics_connections.pop(uuid, None)
+        if graphics_connection is None:
+            return
+
+        scene = graphics_connection.scene()
+        if scene is not None:
+            scene.removeItem(graphics_connection)
+
+    @traced("signal")
+    def create_graphics_graph(self, graph: Graph) -> GraphicsGraphRecord:
+        """Create a graphics graph record and register it to the graphics state."""
+        record = GraphicsGraphRecord.from_graph(self, graph)
+        self._graphics_graphs[graph.uuid()] = record
         logger.debug("Created graphics graph %s.", graph.uuid())
-        return graphics_graph
+        return record
 
+    @traced("signal")
     def delete_graphics_graph(self, graph: Graph) -> None:
         """Delete a graphics graph and unregister it from the graphics state."""
-        del self._graphics_graphs[graph.uuid()]
+        record = self._graphics_graphs.pop(graph.uuid())
+        self._graphics_graph_cache.pop(graph.uuid(), None)
+        record.release_graphics_graph()
         logger.debug("Deleted graphics graph %s.", graph.uuid())
 
-    def create_graphics_node(self, node: Node) -> GraphicsNode:
-        """Create a graphics node and register it to the graphics state."""
-        graphics_node = GraphicsNode.from_node(self, node)
-        self._graphics_nodes[node.uuid()] = graphics_node
-
-        node_pos = self._view.mapToScene(self._view.viewport().rect().center())
-        graphics_node.setPos(node_pos)
-
-        logger.debug("Created graphics node %s.", node.uuid())
-        return graphics_node
-
+    @traced("signal")
+    def create_graphics_node(self, node: Node) -> None:
+        """Register a node to the graphics state.
+
+        Its graphics node is only built once its graph is displayed.
+        """
+        uuid = node.uuid()
+        self._node_ports[uuid] = {}
+        self._node_positions[uuid] = self._view.mapToScene(
+            self._view.viewport().rect().center()
+        )
+
+        node.port_registered.subscribe(
+            lambda port: self._register_node_port(uuid, port)
+        )
+        node.port_unregistered.subscribe(
+            lambda port: self._unregister_node_port(uuid, port)
+        )
+        node.name_changed.subscribe(lambda name: self._rename_node(uuid, name))
+
+        logger.debug("Created graphics node %s.", uuid)
+
+    @traced("signal")
     def delete_graphics_node(self, node: Node) -> None:
         """Delete a graphics node and unregister it from the graphics state."""
-        del self._graphics_nodes[node.uuid()]
-        logger.debug("Deleted graphics node %s.", node.uuid())
-
-    def create_graphics_port(self, port: Port) -> GraphicsPort:
-        """Create a graphics port and register it to the graphics state."""
-        graphics_port = GraphicsPort.from_port(self, port)
-        self._graphics_ports[port.uuid()] = graphics_port
+        uuid = node.uuid()
+        self.cancel_node_rename(uuid)
+        self._graphics_nodes.pop(uuid, None)
+        self._node_positions.pop(uuid, None)
+        del self._node_ports[uuid]
+        logger.debug("Deleted graphics node %s.", uuid)
+
+    @traced("signal")
+    def _register_node_port(self, node_id: UUID, port: Port) -> None:
+        self._node_ports[node_id][port.uuid()] = None
+        self._port_nodes[port.uuid()] = node_id
+
+        graphics_node = self._graphics_nodes.get(node_id)
+        if graphics_node:
+            graphics_node.register_graphics_port(port)
+
+    @traced("signal")
+    def _unregister_node_port(self, node_id: UUID, port: Port) -> None:
+        del self._node_ports[node_id][port.uuid()]
+
+        graphics_node = self._graphics_nodes.get(node_id)
+        if graphics_node:
+            graphics_node.unregister_graphics_port(port)
+
+    @traced("signal")
+    def _rename_node(self, node_id: UUID, name: str) -> None:
+        graphics_node = self._graphics_nodes.get(node_id)
+        if graphics_node:
+            graphics_node.set_name(name)
+
+    @traced("signal")
+    def create_graphics_port(self, port: Port) -> None:
+        """Register a port to the graphics state.
+
+        Its graphics port is only built with its graphics node.
+        """
+        uuid = port.uuid()
+        self._port_connections.setdefault(uuid, {})
+        port.name_changed.subscribe(lambda name: self._rename_port(uuid, name))
         logger.debug("Created graphics port %s.", port.path())
-        return graphics_port
 
+    @traced("signal")
     def delete_graphics_port(self, port: Port) -> None:
         """Delete a graphics port and unregister it from the graphics state."""
-        graphics_port = self._graphics_ports.pop(port.uuid())
+        uuid = port.uuid()
+        # Connections are normally deleted first, drop the items of any leftover.
+        for connection_id in self._port_connections.pop(uuid, ()):
+            self.release_graphics_connection(connection_id)
+        self._graphics_ports.pop(uuid, None)
+        self._port_nodes.pop(uuid, None)
+        self._expanded_ports.discard(uuid)
         logger.debug("Deleted graphics port %s.", port.uuid())
 
-    def create_graphics_connection(self, connection: Connection) -> GraphicsConnection:
-        """Create a graphics connection and register it to the graphics state."""
-        graphics_connection = GraphicsConnection.from_connection(self, connection)
-        self._graphics_connections[connection.uuid()] = graphics_connection
+    @traced("signal")
+    def _rename_port(self, port_id: UUID, name: str) -> None:
+        graphics_port = self._graphics_ports.get(port_id)
+        if graphics_port:
+            graphics_port.set_name(name)
+
+    @traced("signal")
+    def create_graphics_connection(self, connection: Connection) -> None:
+        """Register a connection to the graphics state.
+
+        Its graphics connection is only built once its graph is displayed.
+        """
+        uuid = connection.uuid()
+        for port in (connection.source(), connection.target()):
+            self._port_connections.setdefault(port.uuid(), {})[uuid] = None
         logger.debug("Created graphics connection %s.", connection.uuid())
-        return graphics_connection
 
+    @traced("signal")
     def delete_graphics_connection(self, connection: Connection) -> None:
         """Delete a graphics connection and unregister it from the graphics state."""
-        del self._graphics_connections[connection.uuid()]
+        uuid = connection.uuid()
+        for port in (connection.source(), connection.target()):
+            port_connections = self._port_connections.get(port.uuid())
+            if port_connections is not None:
+                port_connections.pop(uuid, None)
+
+        self._graphics_connections.pop(uuid, None)
         logger.debug("Deleted graphics connection %s.", connection.uuid())
@@ -1,29 +1,34 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 from uuid import uuid4
 
 import attr
 import orodruin.commands
 from orodruin.core.port.port import PortDirection
-from PySide2.QtCore import QEvent, Qt
+from PySide2.QtCore import QEvent, QPoint, QRect, QRectF, Qt, QTimer
 from PySide2.QtGui import (
+    QBrush,
+    QColor,
     QContextMenuEvent,
     QFont,
     QKeyEvent,
     QMouseEvent,
     QPainter,
+    QPainterPath,
+    QPaintEvent,
     QWheelEvent,
 )
 from PySide2.QtWidgets import (
-    QGraphicsTextItem,
+    QGraphicsItem,
     QGraphicsView,
     QInputDialog,
     QMenu,
     QWidget,
 )
 
+from orodruin_editor.core.tracing import do_command
 from orodruin_editor.ui.editor.dialogs.create_port_dialog import CreatePortDialog
 from orodruin_editor.ui.editor.graphics_items.graphics_node_name import GraphicsNodeName
 
@@ -31,6 +36,9 @@ from .graphics_items.graphics_connection import GraphicsConnection
 from .graphics_items.graphics_node import GraphicsNode
 from .graphics_items.graphics_port import GraphicsPort
 from .graphics_items.graphics_socket import GraphicsSocket
+from .node_drag import NodeDrag
+from .node_rename_editor import NodeRenameEditor
+from .paint_profiler import PaintProfiler, profiled_paint
 
 if TYPE_CHECKING:
     from .graphics_state import GraphicsState
@@ -51,10 +59,33 @@ class GraphicsView(QGraphicsView):
     _font_family: str = attr.ib(init=False, default="Roboto")
     _font_size: int = attr.ib(init=False, default=20)
     _path_font: QFont = attr.ib(init=False)
+    _path_height: int = attr.ib(init=False, default=60)
+
+    _viewport_update_mode: QGraphicsView.ViewportUpdateMode = attr.ib(
+        init=False, default=QGraphicsView.MinimalViewportUpdate
+    )
 
     _temporary_connection: Optional[GraphicsConnection] = attr.ib(
         init=False, default=None
     )
+    # Distance in pixels under which a dragged connection snaps to a socket.
+    _snap_radius: int = attr.ib(init=False, default=20)
+    _snapped_graphics_port: Optional[GraphicsPort] = attr.ib(init=False, default=None)
+
+    _rename_editor: NodeRenameEditor = attr.ib(init=False)
+    _node_drag: NodeDrag = attr.ib(init=False)
+
+    # Nodes are drawn from a pixmap cache while panning.
+    _cache_nodes_while_panning: bool = attr.ib(init=False, default=True)
+    _cached_graphics_nodes: List[GraphicsNode] = attr.ib(init=False, factory=list)
+
+    _paint_profiler: PaintProfiler = attr.ib(init=False, factory=PaintProfiler)
+    _hud_visible: bool = attr.ib(init=False, default=False)
+    _hud_timer: QTimer = attr.ib(init=False)
+    _hud_font: QFont = attr.ib(init=False)
+    _hud_width: int = attr.ib(init=False, default=320)
+    _hud_height: int = attr.ib(init=False, default=230)
+    _hud_margin: int = attr.ib(init=False, default=10)
 
     def __attrs_post_init__(self) -> None:
         super().__init__(parent=self._parent)
@@ -68,19 +99,197 @@ class GraphicsView(QGraphicsView):
             | QPainter.SmoothPixmapTransform
         )
 
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        self.setViewportUpdateMode(self._viewport_update_mode)
+        self.setCacheMode(QGraphicsView.CacheBackground)
 
         self.setDragMode(QGraphicsView.RubberBandDrag)
 
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
+        self._rename_editor = NodeRenameEditor(self)
+        self._node_drag = NodeDrag(self)
+
+        self._hud_font = QFont("Roboto Mono", 9)
+        # The HUD is refreshed on its own, the scene may not be repainted at all.
+        self._hud_timer = QTimer(self)
+        self._hud_timer.setInterval(250)
+        self._hud_timer.timeout.connect(
+            lambda: self.viewport().update(self._hud_rect())
+        )
+
     def graphics_state(self) -> GraphicsState:
         return self._graphics_state
 
     def set_graphics_state(self, state: GraphicsState):
         self._graphics_state = state
 
+    def set_viewport_update_mode(self, mode: QGraphicsView.ViewportUpdateMode) -> None:
+        """Change how the viewport is repainted when the scene changes."""
+        self._viewport_update_mode = mode
+        self.setViewportUpdateMode(mode)
+        self.viewport().update()
+
+    def cache_nodes_while_panning(self) -> bool:
+        return self._cache_nodes_while_panning
+
+    def set_cache_nodes_while_panning(self, cache: bool) -> None:
+        """Set whether nodes are drawn from a pixmap cache while panning."""
+        self._cache_nodes_while_panning = cache
+
+    def _cache_visible_nodes(self) -> None:
+        visible_rect = self.mapToScene(self.viewport().rect()).boundingRect()
+        self._cached_graphics_nodes = [
+            item
+            for item in self.scene().items(visible_rect)
+            if isinstance(item, GraphicsNode)
+        ]
+        for graphics_node in self._cached_graphics_nodes:
+            graphics_node.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+    def _uncache_nodes(self) -> None:
+        for graphics_node in self._cached_graphics_nodes:
+            graphics_node.setCacheMode(QGraphicsItem.NoCache)
+        self._cached_graphics_nodes = []
+
+    def rename_editor(self) -> NodeRenameEditor:
+        return self._rename_editor
+
+    def paint_profiler(self) -> PaintProfiler:
+        return self._paint_profiler
+
+    def is_hud_visible(self) -> bool:
+        return self._hud_visible
+
+    def set_hud_visible(self, visible: bool) -> None:
+        """Show or hide the frame time HUD, paint times are collected while shown."""
+        self._hud_visible = visible
+        if visible:
+            self._paint_profiler.reset()
+            self._paint_profiler.install()
+            self._hud_timer.start()
+        else:
+            self._paint_profiler.uninstall()
+            self._hud_timer.stop()
+        self.viewport().update()
+
+    def _path_rect(self) -> QRect:
+        """Viewport area covered by the path of the active graph."""
+        return QRect(0, 0, self.viewport().width(), self._path_height)
+
+    def _hud_rect(self) -> QRect:
+        """Viewport area covered by the frame time HUD."""
+        return QRect(
+            self.viewport().width() - self._hud_width - self._hud_margin,
+            self._hud_margin,
+            self._hud_width,
+            self._hud_height,
+        )
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        super().scrollContentsBy(dx, dy)
+        self._rename_editor.update_geometry()
+        # The overlays are drawn at a fixed viewport position. Scrolling blits
+        # them along with the scene when the whole viewport isn't repainted.
+        if self.viewportUpdateMode() != QGraphicsView.FullViewportUpdate:
+            overlay_rects = [self._path_rect()]
+            if self._hud_visible:
+                overlay_rects.append(self._hud_rect())
+            for rect in overlay_rects:
+                self.viewport().update(rect)
+                self.viewport().update(rect.translated(dx, dy))
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if not self._hud_visible:
+            super().paintEvent(event)
+            return
+
+        # Repaints of the HUD alone aren't frames of the scene.
+        is_frame = not self._hud_rect().contains(event.rect())
+        if is_frame:
+            self._paint_profiler.begin_frame()
+        super().paintEvent(event)
+        if is_frame:
+            self._paint_profiler.end_frame()
+
+        if event.rect().intersects(self._hud_rect()):
+            painter = QPainter(self.viewport())
+            self._draw_hud(painter)
+            painter.end()
+
+    def _draw_hud(self, painter: QPainter) -> None:
+        profiler = self._paint_profiler
+        rect = self._hud_rect()
+        line_height = 16
+        padding = 8
+
+        painter.fillRect(rect, QColor(0, 0, 0, 190))
+        painter.setPen(Qt.white)
+        painter.setFont(self._hud_font)
+
+        last_frame = profiler.last_frame()
+        lines = [f"{profiler.fps():.0f} fps"]
+        if last_frame:
+            lines.append(f"frame {last_frame.duration * 1000:.2f} ms")
+            lines.append(f"items painted {last_frame.items_painted()}")
+
+        paint_times = sorted(
+            profiler.paint_times().items(), key=lambda item: item[1], reverse=True
+        )
+        for label, paint_time in paint_times[:5]:
+            lines.append(f"{label:<28}{paint_time * 1000:>9.1f} ms")
+
+        text_rect = rect.adjusted(padding, padding, -padding, -padding)
+        for index, line in enumerate(lines):
+            painter.drawText(
+                text_rect.translated(0, index * line_height),
+                Qt.AlignLeft | Qt.AlignTop,
+                line,
+            )
+
+        histogram = profiler.histogram()
+        max_count = max((count for _, count in histogram), default=0) or 1
+        bar_area_top = text_rect.top() + len(lines) * line_height + padding
+        bar_area_height = text_rect.bottom() - bar_area_top - line_height
+        bar_width = text_rect.width() // len(histogram)
+        # Frames under 16ms keep up with a 60Hz display.
+        for index, (label, count) in enumerate(histogram):
+            bar_height = round(bar_area_height * count / max_count)
+            left = text_rect.left() + index * bar_width
+            painter.fillRect(
+                left + 2,
+                bar_area_top + bar_area_height - bar_height,
+                bar_width - 4,
+                bar_height,
+                QColor("#4caf50") if index < 3 else QColor("#e53935"),
+            )
+            painter.drawText(
+                QRect(left, text_rect.bottom() - line_height, bar_width, line_height),
+                Qt.AlignCenter,
+                label,
+            )
+
+    @profiled_paint
+    def drawForeground(self, painter: QPainter, rect: QRectF) -> None:
+        super().drawForeground(painter, rect)
+
+        graph = self._graphics_state.get_graph(self._graphics_state.active_graph())
+        parent_node = graph.parent_node()
+        if parent_node:
+            path_text = str(parent_node.path())
+        else:
+            path_text = "/"
+
+        path_name = QPainterPath()
+        path_name.addText(25, 40, self._path_font, path_text)
+
+        painter.save()
+        painter.resetTransform()
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QBrush(Qt.darkGray))
+        painter.drawPath(path_name)
+        painter.restore()
+
     def mousePressEvent(self, event: QMouseEvent) -> None:
         if event.button() == Qt.LeftButton:
             self.on_left_mouse_pressed(event)
@@ -113,25 +322,54 @@ class GraphicsView(QGraphicsView):
         else:
             zoom_factor = 1 / self._zoom_in_factor
         self.scale(zoom_factor, zoom_factor)
+        self._rename_editor.update_geometry()
 
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
-        item = self.itemAt(event.pos())
-
-        if isinstance(item, QGraphicsTextItem):
-            item = item.parentItem()
-
+        if self._node_drag.is_dragging():
+            # The scene doesn't move the nodes itself, the drag does once per frame.
+            self._node_drag.move(self.mapToScene(event.pos()))
+            return None
         if self._temporary_connection:
-            if isinstance(item, GraphicsSocket):
-                self._temporary_connection.mouse_position = (
-                    item._graphics_port.scene_socket_position()
-                )
-            elif isinstance(item, GraphicsPort):
-                self._temporary_connection.mouse_position = item.scene_socket_position()
+            self._snapped_graphics_port = self._snap_graphics_port(event.pos())
+            if self._snapped_graphics_port:
+                position = self._snapped_graphics_port.scene_socket_position()
             else:
-                self._temporary_connection.mouse_position = self.mapToScene(event.pos())
-            self._temporary_connection.update_path()
+                position = self.mapToScene(event.pos())
+            self._temporary_connection.set_mouse_position(position)
         return super().mouseMoveEvent(event)
 
+    def _snap_graphics_port(self, position: QPoint) -> Optional[GraphicsPort]:
+        """Return the port the temporary connection can snap to."""
+        connection = self._temporary_connection
+        if connection.source_graphics_port():
+            origin = connection.source_graphics_port()
+            direction = PortDirection.input
+        else:
+            origin = connection.target_graphics_port()
+            direction = PortDirection.output
+
+        origin_graphics_node = origin.topLevelItem()
+        origin_type = origin.type()
+
+        def is_compatible(graphics_port: GraphicsPort) -> bool:
+            # A port can't connect to the ports of its own node.
+            return (
+                graphics_port.direction() is direction
+                and graphics_port.type() == origin_type
+                and graphics_port.isVisible()
+                and graphics_port.topLevelItem() is not origin_graphics_node
+            )
+
+        return (
+            self.scene()
+            .socket_index()
+            .nearest(
+                self.mapToScene(position),
+                self._snap_radius / self.transform().m11(),
+                is_compatible,
+            )
+        )
+
     def keyPressEvent(self, event: QKeyEvent) -> None:
         if event.key() == Qt.Key_G and event.modifiers() == Qt.ControlModifier:
             self.on_control_g_pressed(event)
@@ -148,9 +386,6 @@ class GraphicsView(QGraphicsView):
         """Handle left mouse button pressed event."""
         item = self.itemAt(event.pos())
 
-        if isinstance(item, QGraphicsTextItem):
-            item = item.parentItem()
-
         if isinstance(item, GraphicsSocket):
             if item.direction() == PortDirection.output:
                 source = item._graphics_port
@@ -164,10 +399,16 @@ class GraphicsView(QGraphicsView):
                 source_graphics_port=source,
                 target_graphics_port=target,
             )
-            self._temporary_connection.mouse_position = self.mapToScene(event.pos())
+            self._temporary_connection.set_mouse_position(self.mapToScene(event.pos()))
             self.scene().addItem(self._temporary_connection)
         else:
             super().mousePressEvent(event)
+            graphics_node = item.topLevelItem() if item else None
+            if (
+                isinstance(graphics_node, GraphicsNode)
+                and self.dragMode() != QGraphicsView.ScrollHandDrag
+            ):
+                self._node_drag.start(graphics_node, self.mapToScene(event.pos()))
 
     def on_right_mouse_pressed(self, event: QMouseEvent):
         """Handle right mouse button pressed event."""
@@ -175,6 +416,14 @@ class GraphicsView(QGraphicsView):
 
     def on_middle_mouse_pressed(self, event: QMouseEvent):
         """Handle middle mouse button pressed event."""
+        # Panning only scrolls the viewport, blit what is already drawn
+        # instead of repainting everything.
+        if self._viewport_update_mode == QGraphicsView.FullViewportUpdate:
+            self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        # Nodes only translate on screen, their device pixmaps stay valid.
+        # Only the nodes on screen are cached, the others may never be drawn.
+        if self._cache_nodes_while_panning:
+            self._cache_visible_nodes()
         self.setDragMode(QGraphicsView.ScrollHandDrag)
         press_event = QMouseEvent(
             QEvent.MouseButtonPress,
@@ -189,17 +438,21 @@ class GraphicsView(QGraphicsView):
     def on_left_mouse_released(self, event: QMouseEvent):
         """Handle left mouse button released event."""
         item = self.itemAt(event.pos())
+        self._node_drag.finish()
 
-        if isinstance(item, QGraphicsTextItem):
-            item = item.parentItem()
+        if self._temporary_connection:
+            graphics_port = self._snapped_graphics_port
+            if graphics_port is None and isinstance(item, GraphicsSocket):
+                graphics_port = item.graphics_port()
+            elif graphics_port is None and isinstance(item, GraphicsPort):
+                graphics_port = item
 
-        if isinstance(item, (GraphicsSocket, GraphicsPort)):
-            if self._temporary_connection:
+            if graphics_port is not None:
                 if self._temporary_connection.source_graphics_port():
                     source_id = self._temporary_connection.source_graphics_port().uuid()
-                    target_id = item.uuid()
+                    target_id = graphics_port.uuid()
                 else:
-                    source_id = item.uuid()
+                    source_id = graphics_port.uuid()
                     target_id = self._temporary_connection.target_graphics_port().uuid()
 
                 connect_port_command = orodruin.commands.ConnectPorts(
@@ -210,7 +463,7 @@ class GraphicsView(QGraphicsView):
                     force=True,
                 )
                 try:
-                    connect_port_command.do()
+                    do_command(connect_port_command)
                 except Exception as e:
                     logger.error(e)
         elif isinstance(item, GraphicsNodeName):
@@ -220,6 +473,7 @@ class GraphicsView(QGraphicsView):
         if self._temporary_connection:
             self.scene().removeItem(self._temporary_connection)
             self._temporary_connection = None
+            self._snapped_graphics_port = None
 
     def on_right_mouse_released(self, event: QMouseEvent):
         """Handle right mouse button released event."""
@@ -237,14 +491,13 @@ class GraphicsView(QGraphicsView):
         )
         super().mouseReleaseEvent(fake_event)
         self.setDragMode(QGraphicsView.RubberBandDrag)
+        self.setViewportUpdateMode(self._viewport_update_mode)
+        self._uncache_nodes()
 
     def on_left_mouse_double_clicked(self, event: QMouseEvent):
         """Handle left mouse button double click event."""
         item = self.itemAt(event.pos())
 
-        if isinstance(item, QGraphicsTextItem):
-            item = item.parentItem()
-
         if item is None:
             graphics_graph = self._graphics_state.active_graph()
             graph = self._graphics_state.get_graph(graphics_graph)
@@ -258,10 +511,7 @@ class GraphicsView(QGraphicsView):
             graphics_graph = self._graphics_state.get_graphics_graph(node.graph())
             self._graphics_state.set_active_graph(graphics_graph)
         elif isinstance(item, GraphicsPort):
-            if item.child_ports_layout().isVisible():
-                item.child_ports_layout().hide()
-            else:
-                item.child_ports_layout().show()
+            item.set_expanded(not item.is_expanded())
         else:
             super().mouseDoubleClickEvent(event)
 
@@ -275,27 +525,64 @@ class GraphicsView(QGraphicsView):
 
     def on_del_released(self, event: QKeyEvent):
         """Handle del key released event."""
-        selected_items = self.scene().selectedItems()
+        scene = self.scene()
+        selected_items = scene.selectedItems()
         selected_nodes = [
             item for item in selected_items if isinstance(item, GraphicsNode)
         ]
         selected_connections = [
             item for item in selected_items if isinstance(item, GraphicsConnection)
         ]
-        for graphics_connection in selected_connections:
-            orodruin.commands.DisconnectPorts(
-                self._graphics_state.state(),
-                self._graphics_state.active_graph().uuid(),
-                graphics_connection.source_graphics_port().uuid(),
-                graphics_connection.target_graphics_port().uuid(),
-            ).do()
+        if not selected_nodes and not selected_connections:
+            return
 
+        # Connections of the deleted nodes are deleted with them,
+        # only disconnect the other selected connections.
+        node_connection_ids = set()
         for graphics_node in selected_nodes:
-            if isinstance(graphics_node, GraphicsNode):
-                orodruin.commands.DeleteNode(
-                    self._graphics_state.state(),
-                    graphics_node.uuid(),
-                ).do()
+            node_connection_ids.update(
+                self._graphics_state.node_connections(graphics_node.uuid())
+            )
+        selected_connections = [
+            graphics_connection
+            for graphics_connection in selected_connections
+            if graphics_connection.uuid() not in node_connection_ids
+        ]
+
+        if self._rename_editor.node_id() in {node.uuid() for node in selected_nodes}:
+            self._rename_editor.cancel_rename()
+
+        # Removing selected items emits a selection change for each of them.
+        scene.clearSelection()
+
+        # The items of the whole deletion are removed in one pass, the commands
+        # then only update the orodruin state.
+        self._graphics_state.remove_graphics_items(selected_nodes, selected_connections)
+
+        with self._graphics_state.batch():
+            for graphics_connection in selected_connections:
+                do_command(
+                    orodruin.commands.DisconnectPorts(
+                        self._graphics_state.state(),
+                        self._graphics_state.active_graph().uuid(),
+                        graphics_connection.source_graphics_port().uuid(),
+                        graphics_connection.target_graphics_port().uuid(),
+                    )
+                )
+
+            for graphics_node in selected_nodes:
+                do_command(
+                    orodruin.commands.DeleteNode(
+                        self._graphics_state.state(),
+                        graphics_node.uuid(),
+                    )
+                )
+
+        logger.debug(
+            "Deleted %s nodes and %s connections.",
+            len(selected_nodes),
+            len(selected_connections),
+        )
 
     def on_control_g_pressed(self, event: QKeyEvent):
         """Handle control-g released event."""
@@ -304,18 +591,18 @@ class GraphicsView(QGraphicsView):
             item.uuid() for item in selected_items if isinstance(item, GraphicsNode)
         ]
 
-        orodruin.commands.GroupNodes(
-            self._graphics_state.state(),
-            self._graphics_state.active_graph().uuid(),
-            selected_nodes_ids,
-        ).do()
+        with self._graphics_state.batch():
+            do_command(
+                orodruin.commands.GroupNodes(
+                    self._graphics_state.state(),
+                    self._graphics_state.active_graph().uuid(),
+                    selected_nodes_ids,
+                )
+            )
 
     def contextMenuEvent(self, event: QContextMenuEvent) -> None:
         item = self.itemAt(event.pos())
 
-        if isinstance(item, QGraphicsTextItem):
-            item = item.parentItem()
-
         if isinstance(item, GraphicsNode):
             self.on_node_context_menu_event(item, event)
         elif isinstance(item, GraphicsPort):
@@ -360,13 +647,15 @@ class GraphicsView(QGraphicsView):
             name = create_port_dialog.port_name()
             direction = create_port_dialog.port_direction()
             port_type = create_port_dialog.port_type()
-            orodruin.commands.CreatePort(
-                self._graphics_state.state(),
-                graphics_node.uuid(),
-                name,
-                direction,
-                port_type,
-            ).do()
+            do_command(
+                orodruin.commands.CreatePort(
+                    self._graphics_state.state(),
+                    graphics_node.uuid(),
+                    name,
+                    direction,
+                    port_type,
+                )
+            )
 
     def on_rename_port(self, graphics_port: GraphicsPort):
         """Rename the port."""
@@ -381,13 +670,17 @@ class GraphicsView(QGraphicsView):
 
         if return_code:
             new_name = rename_port_dialog.textValue()
-            orodruin.commands.RenamePort(
-                self._graphics_state.state(),
-                port,
-                new_name,
-            ).do()
+            do_command(
+                orodruin.commands.RenamePort(
+                    self._graphics_state.state(),
+                    port,
+                    new_name,
+                )
+            )
 
     def on_delete_port(self, graphics_port: GraphicsPort) -> None:
-        orodruin.commands.DeletePort(
-            self._graphics_state.state(), graphics_port.uuid()
-        ).do()
+        do_command(
+            orodruin.commands.DeletePort(
+                self._graphics_state.state(), graphics_port.uuid()
+            )
+        )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import attr
+from PySide2.QtGui import QPainter
+from PySide2.QtWidgets import QStyleOptionGraphicsItem
+
+
+@attr.s
+class LevelOfDetail:
+    """Zoom levels below which the graphics items are drawn with less detail."""
+
+    # Nodes collapse to a single filled rect.
+    node_shape: float = attr.ib(default=0.4)
+    # Node and port names are skipped.
+    text: float = attr.ib(default=0.5)
+    # Sockets are skipped.
+    socket: float = attr.ib(default=0.3)
+    # Connections are drawn as plain polylines without gradient.
+    connection_gradient: float = attr.ib(default=0.3)
+
+
+def level_of_detail(painter: QPainter, option: QStyleOptionGraphicsItem) -> float:
+    """Return the zoom level an item is currently painted at."""
+    return option.levelOfDetailFromTransform(painter.worldTransform())
+
+
+__all__ = [
+    "LevelOfDetail",
+    "level_of_detail",
+]
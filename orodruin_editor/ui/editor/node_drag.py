@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from math import floor
+from typing import TYPE_CHECKING, List, Optional, Set
+
+import attr
+from PySide2.QtCore import QPointF, QTimer
+from PySide2.QtWidgets import QGraphicsItem
+
+if TYPE_CHECKING:
+    from .graphics_items.graphics_connection import GraphicsConnection
+    from .graphics_items.graphics_node import GraphicsNode
+    from .graphics_items.graphics_port import GraphicsPort
+    from .graphics_view import GraphicsView
+
+
+@attr.s
+class NodeDrag:
+    """Move the selected nodes of a view with the mouse.
+
+    Mouse moves only record the latest position, the nodes are moved at most
+    once per frame. The whole group is snapped to the grid at once, connections
+    between two dragged nodes are translated and only the connections leaving
+    the group are rebuilt.
+    """
+
+    _view: GraphicsView = attr.ib()
+    _frame_interval: int = attr.ib(default=16)  # in milliseconds
+
+    _graphics_nodes: List[GraphicsNode] = attr.ib(init=False, factory=list)
+    _start_positions: List[QPointF] = attr.ib(init=False, factory=list)
+    _graphics_ports: List[GraphicsPort] = attr.ib(init=False, factory=list)
+    _internal_connections: List[GraphicsConnection] = attr.ib(init=False, factory=list)
+    _boundary_connections: List[GraphicsConnection] = attr.ib(init=False, factory=list)
+
+    _anchor_position: QPointF = attr.ib(init=False, factory=QPointF)
+    _press_position: QPointF = attr.ib(init=False, factory=QPointF)
+    _mouse_position: Optional[QPointF] = attr.ib(init=False, default=None)
+    _offset: QPointF = attr.ib(init=False, factory=QPointF)
+
+    _timer: QTimer = attr.ib(init=False)
+
+    def __attrs_post_init__(self) -> None:
+        self._timer = QTimer(self._view)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self._frame_interval)
+        self._timer.timeout.connect(self._apply)
+
+    def is_dragging(self) -> bool:
+        return bool(self._graphics_nodes)
+
+    def start(self, anchor: GraphicsNode, scene_position: QPointF) -> None:
+        """Start dragging the selected nodes, snapping the anchor to the grid."""
+        self._graphics_nodes = [
+            item
+            for item in self._view.scene().selectedItems()
+            if item.flags() & QGraphicsItem.ItemIsMovable and item.parentItem() is None
+        ]
+        if anchor not in self._graphics_nodes:
+            self._graphics_nodes = []
+            return
+
+        self._start_positions = [node.pos() for node in self._graphics_nodes]
+        self._anchor_position = anchor.pos()
+        self._press_position = scene_position
+        self._mouse_position = None
+        self._offset = QPointF()
+
+        graphics_ports: Set[GraphicsPort] = set()
+        for graphics_node in self._graphics_nodes:
+            graphics_ports.update(graphics_node.graphics_ports())
+            # The group is snapped and its connections updated here instead.
+            graphics_node.setFlag(QGraphicsItem.ItemSendsGeometryChanges, False)
+            graphics_node.setFlag(QGraphicsItem.ItemSendsScenePositionChanges, False)
+        self._graphics_ports = list(graphics_ports)
+
+        graphics_connections: Set[GraphicsConnection] = set()
+        for graphics_port in self._graphics_ports:
+            graphics_connections.update(
+                self._view.graphics_state().port_graphics_connections(graphics_port)
+            )
+        self._internal_connections = []
+        self._boundary_connections = []
+        for graphics_connection in graphics_connections:
+            if (
+                graphics_connection.source_graphics_port() in graphics_ports
+                and graphics_connection.target_graphics_port() in graphics_ports
+            ):
+                self._internal_connections.append(graphics_connection)
+            else:
+                self._boundary_connections.append(graphics_connection)
+
+    def move(self, scene_position: QPointF) -> None:
+        """Record the mouse position, the nodes are moved on the next frame."""
+        if not self.is_dragging():
+            return
+        self._mouse_position = scene_position
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def finish(self) -> None:
+        """Apply the last mouse move and stop dragging."""
+        if not self.is_dragging():
+            return
+        self._timer.stop()
+        self._apply()
+
+        for graphics_node in self._graphics_nodes:
+            graphics_node.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
+            graphics_node.setFlag(QGraphicsItem.ItemSendsScenePositionChanges, True)
+        # Bake the translation back into the internal connections' paths.
+        for graphics_connection in self._internal_connections:
+            graphics_connection.setPos(QPointF())
+            graphics_connection.invalidate_geometry()
+
+        self._graphics_nodes = []
+        self._start_positions = []
+        self._graphics_ports = []
+        self._internal_connections = []
+        self._boundary_connections = []
+
+    def _snapped_offset(self, mouse_position: QPointF) -> QPointF:
+        grid_size = self._view.scene().square_size()
+        position = self._anchor_position + mouse_position - self._press_position
+        return (
+            QPointF(
+                floor(position.x() / grid_size) * grid_size,
+                floor(position.y() / grid_size) * grid_size,
+            )
+            - self._anchor_position
+        )
+
+    def _apply(self) -> None:
+        if self._mouse_position is None:
+            return
+        offset = self._snapped_offset(self._mouse_position)
+        self._mouse_position = None
+        if offset == self._offset:
+            return
+        self._offset = offset
+
+        for graphics_node, start_position in zip(
+            self._graphics_nodes, self._start_positions
+        ):
+            graphics_node.setPos(start_position + offset)
+
+        for graphics_connection in self._internal_connections:
+            graphics_connection.setPos(offset)
+        for graphics_connection in self._boundary_connections:
+            graphics_connection.invalidate_geometry()
+        self._view.scene().socket_index().invalidate(self._graphics_ports)
+        self._view.rename_editor().update_geometry()
+
+
+__all__ = ["NodeDrag"]
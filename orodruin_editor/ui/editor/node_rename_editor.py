@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+from uuid import UUID
+
+import orodruin.commands
+from PySide2.QtCore import QRect, Qt
+from PySide2.QtGui import QKeyEvent
+from PySide2.QtWidgets import QLineEdit
+
+from orodruin_editor.core.tracing import do_command
+
+if TYPE_CHECKING:
+    from .graphics_items.graphics_node import GraphicsNode
+    from .graphics_view import GraphicsView
+
+
+class NodeRenameEditor(QLineEdit):
+    """In-place editor of node names, shared by all the nodes of a view."""
+
+    def __init__(self, view: GraphicsView) -> None:
+        super().__init__(view.viewport())
+        self._view = view
+        self._graphics_node: Optional[GraphicsNode] = None
+        self._height = 20
+
+        self.editingFinished.connect(self.end_rename)
+        self.hide()
+
+    def node_id(self) -> Optional[UUID]:
+        """Return the UUID of the node being renamed."""
+        if self._graphics_node is None:
+            return None
+        return self._graphics_node.uuid()
+
+    def init_rename(self, graphics_node: GraphicsNode) -> None:
+        """Show the editor over the name of the given node."""
+        self._graphics_node = graphics_node
+        self.setText(graphics_node.name())
+        self.setModified(False)
+        self.update_geometry()
+        self.show()
+        self.selectAll()
+        self.setFocus()
+
+    def end_rename(self) -> None:
+        """Rename the node to the text of the editor."""
+        graphics_node = self._graphics_node
+        # Qt sends the editingFinished signal twice, forgetting the node
+        # prevents anything to run the 2nd time.
+        self._graphics_node = None
+        self.hide()
+        if graphics_node is None or not self.isModified():
+            return
+
+        do_command(
+            orodruin.commands.RenameNode(
+                self._view.graphics_state().state(),
+                graphics_node.uuid(),
+                self.text(),
+            )
+        )
+
+    def cancel_rename(self) -> None:
+        self._graphics_node = None
+        self.setModified(False)
+        self.hide()
+
+    def update_geometry(self) -> None:
+        """Move the editor over the name of the node, after a pan or a zoom."""
+        if self._graphics_node is None:
+            return
+        top_left = self._view.mapFromScene(self._graphics_node.scenePos())
+        width = self._view.mapFromScene(
+            self._graphics_node.scenePos().x() + self._graphics_node.width(), 0
+        ).x()
+        self.setGeometry(
+            QRect(
+                top_left.x(),
+                top_left.y() - self._height,
+                max(width - top_left.x(), 50),
+                self._height,
+            )
+        )
+
+    def keyPressEvent(self, event: QKeyEvent) -> None:
+        if event.key() == Qt.Key_Escape:
+            self.cancel_rename()
+            return
+        super().keyPressEvent(event)
+
+
+__all__ = ["NodeRenameEditor"]
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import csv
+import functools
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+import attr
+
+PaintMethod = TypeVar("PaintMethod", bound=Callable[..., Any])
+
+# Only one view is profiled at a time, paint wrappers report to it.
+_active_profiler: Optional[PaintProfiler] = None
+
+
+@attr.s
+class FrameRecord:
+    """Timings of a single paint event of the view."""
+
+    end: float = attr.ib()
+    duration: float = attr.ib()
+    paint_counts: Dict[str, int] = attr.ib()
+    paint_times: Dict[str, float] = attr.ib()
+
+    def items_painted(self) -> int:
+        return sum(
+            count
+            for label, count in self.paint_counts.items()
+            if label.endswith(".paint")
+        )
+
+
+@attr.s
+class PaintProfiler:
+    """Collect frame times and paint times per item class of a graphics view."""
+
+    _max_frames: int = attr.ib(default=600)
+    # Upper bounds of the frame time histogram buckets, in milliseconds.
+    _histogram_bounds: Tuple[float, ...] = attr.ib(default=(4, 8, 16, 33, 66))
+
+    _frames: Deque[FrameRecord] = attr.ib(init=False)
+    _paint_counts: Dict[str, int] = attr.ib(init=False, factory=dict)
+    _paint_times: Dict[str, float] = attr.ib(init=False, factory=dict)
+
+    _frame_start: Optional[float] = attr.ib(init=False, default=None)
+    _frame_paint_counts: Dict[str, int] = attr.ib(init=False, factory=dict)
+    _frame_paint_times: Dict[str, float] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self) -> None:
+        self._frames = deque(maxlen=self._max_frames)
+
+    def install(self) -> None:
+        """Make the paint wrappers report to this profiler."""
+        global _active_profiler  # pylint: disable=global-statement
+        _active_profiler = self
+
+    def uninstall(self) -> None:
+        global _active_profiler  # pylint: disable=global-statement
+        if _active_profiler is self:
+            _active_profiler = None
+
+    def is_installed(self) -> bool:
+        return _active_profiler is self
+
+    def reset(self) -> None:
+        self._frames.clear()
+        self._paint_counts.clear()
+        self._paint_times.clear()
+
+    def begin_frame(self) -> None:
+        self._frame_start = time.perf_counter()
+        self._frame_paint_counts = {}
+        self._frame_paint_times = {}
+
+    def end_frame(self) -> None:
+        if self._frame_start is None:
+            return
+        end = time.perf_counter()
+        self._frames.append(
+            FrameRecord(
+                end,
+                end - self._frame_start,
+                self._frame_paint_counts,
+                self._frame_paint_times,
+            )
+        )
+        self._frame_start = None
+
+    def record_paint(self, label: str, duration: float) -> None:
+        self._paint_counts[label] = self._paint_counts.get(label, 0) + 1
+        self._paint_times[label] = self._paint_times.get(label, 0.0) + duration
+        if self._frame_start is not None:
+            self._frame_paint_counts[label] = self._frame_paint_counts.get(label, 0) + 1
+            self._frame_paint_times[label] = (
+                self._frame_paint_times.get(label, 0.0) + duration
+            )
+
+    def frames(self) -> List[FrameRecord]:
+        return list(self._frames)
+
+    def last_frame(self) -> Optional[FrameRecord]:
+        return self._frames[-1] if self._frames else None
+
+    def fps(self) -> float:
+        """Return the number of frames painted during the last second."""
+        if not self._frames:
+            return 0.0
+        now = time.perf_counter()
+        return float(sum(1 for frame in self._frames if now - frame.end <= 1.0))
+
+    def histogram(self) -> List[Tuple[str, int]]:
+        """Return the number of recorded frames per frame time bucket."""
+        labels = [f"<{bound:g}ms" for bound in self._histogram_bounds]
+        labels.append(f">={self._histogram_bounds[-1]:g}ms")
+        counts = [0] * len(labels)
+        for frame in self._frames:
+            duration = frame.duration * 1000
+            for index, bound in enumerate(self._histogram_bounds):
+                if duration < bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return list(zip(labels, counts))
+
+    def paint_counts(self) -> Dict[str, int]:
+        """Return the number of paint calls per label since the last reset."""
+        return dict(self._paint_counts)
+
+    def paint_times(self) -> Dict[str, float]:
+        """Return the cumulative paint time per label since the last reset."""
+        return dict(self._paint_times)
+
+    def export_csv(self, path: Path) -> None:
+        """Write one row per recorded frame, with the paint time of each label."""
+        labels = sorted(self._paint_times)
+        with open(path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(
+                ["frame", "frame_ms", "items_painted"]
+                + [f"{label} count" for label in labels]
+                + [f"{label} ms" for label in labels]
+            )
+            for index, frame in enumerate(self._frames):
+                writer.writerow(
+                    [index, f"{frame.duration * 1000:.3f}", frame.items_painted()]
+                    + [frame.paint_counts.get(label, 0) for label in labels]
+                    + [
+                        f"{frame.paint_times.get(label, 0.0) * 1000:.3f}"
+                        for label in labels
+                    ]
+                )
+
+
+def profiled_paint(paint: PaintMethod) -> PaintMethod:
+    """Report the time spent in a paint method to the installed profiler."""
+
+    @functools.wraps(paint)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        profiler = _active_profiler
+        if profiler is None:
+            return paint(self, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return paint(self, *args, **kwargs)
+        finally:
+            profiler.record_paint(
+                f"{type(self).__name__}.{paint.__name__}",
+                time.perf_counter() - start,
+            )
+
+    return wrapper  # type: ignore
+
+
+__all__ = [
+    "FrameRecord",
+    "PaintProfiler",
+    "profiled_paint",
+]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import attr
+from PySide2.QtCore import QRectF
+from PySide2.QtGui import QPainterPath
+
+
+@attr.s(frozen=True)
+class NodeShapes:
+    """Simplified paths a node body is drawn with."""
+
+    outline: QPainterPath = attr.ib()
+    header: QPainterPath = attr.ib()
+    body: QPainterPath = attr.ib()
+
+
+@attr.s
+class ShapeCache:
+    """Shared cache of the node shapes, per node size.
+
+    Nodes of the same size share their shapes, which are simplified once
+    instead of on every paint.
+    """
+
+    _node_shapes: Dict[Tuple[float, float, float, float], NodeShapes] = attr.ib(
+        init=False, factory=dict
+    )
+
+    def node_shapes(
+        self,
+        width: float,
+        height: float,
+        header_height: float,
+        corner_radius: float,
+    ) -> NodeShapes:
+        key = (width, height, header_height, corner_radius)
+        node_shapes = self._node_shapes.get(key)
+        if node_shapes is None:
+            node_shapes = self._build_node_shapes(*key)
+            self._node_shapes[key] = node_shapes
+        return node_shapes
+
+    @staticmethod
+    def _build_node_shapes(
+        width: float,
+        height: float,
+        header_height: float,
+        corner_radius: float,
+    ) -> NodeShapes:
+        outline = QPainterPath()
+        outline.addRoundedRect(0, 0, width, height, corner_radius, corner_radius)
+
+        # The body covers the bottom half of the header.
+        header_rect = QPainterPath()
+        header_rect.addRect(QRectF(0, 0, width, header_height / 2))
+        body_rect = QPainterPath()
+        body_rect.addRect(
+            QRectF(0, header_height / 2, width, height - header_height / 2)
+        )
+
+        return NodeShapes(
+            outline.simplified(),
+            outline.intersected(header_rect).simplified(),
+            outline.intersected(body_rect).simplified(),
+        )
+
+    def size(self) -> int:
+        return len(self._node_shapes)
+
+    def clear(self) -> None:
+        self._node_shapes.clear()
+
+
+__all__ = [
+    "NodeShapes",
+    "ShapeCache",
+]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from math import ceil, floor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import attr
+from PySide2.QtCore import QPointF
+
+if TYPE_CHECKING:
+    from .graphics_items.graphics_port import GraphicsPort
+
+Cell = Tuple[int, int]
+
+
+@attr.s
+class SocketIndex:
+    """Spatial hash of the sockets of a scene, to find the socket near a point.
+
+    Ports are bucketed by the scene position of their socket. Moved ports are
+    only marked as dirty and bucketed again on the next query, so dragging
+    nodes around costs nothing until a connection is dragged.
+    """
+
+    _cell_size: float = attr.ib(default=50)
+
+    _cells: Dict[Cell, Set[GraphicsPort]] = attr.ib(init=False, factory=dict)
+    _port_cells: Dict[GraphicsPort, Cell] = attr.ib(init=False, factory=dict)
+    _dirty_ports: Set[GraphicsPort] = attr.ib(init=False, factory=set)
+
+    def _cell(self, position: QPointF) -> Cell:
+        return (
+            floor(position.x() / self._cell_size),
+            floor(position.y() / self._cell_size),
+        )
+
+    def add(self, graphics_port: GraphicsPort) -> None:
+        self._dirty_ports.add(graphics_port)
+
+    def remove(self, graphics_port: GraphicsPort) -> None:
+        self._dirty_ports.discard(graphics_port)
+        cell = self._port_cells.pop(graphics_port, None)
+        if cell is not None:
+            self._remove_from_cell(graphics_port, cell)
+
+    def invalidate(self, graphics_ports: Iterable[GraphicsPort]) -> None:
+        """Mark the sockets of the given ports as moved."""
+        for graphics_port in graphics_ports:
+            if graphics_port in self._port_cells:
+                self._dirty_ports.add(graphics_port)
+
+    def _remove_from_cell(self, graphics_port: GraphicsPort, cell: Cell) -> None:
+        ports = self._cells[cell]
+        ports.discard(graphics_port)
+        if not ports:
+            del self._cells[cell]
+
+    def _flush(self) -> None:
+        for graphics_port in self._dirty_ports:
+            cell = self._cell(graphics_port.scene_socket_position())
+            previous_cell = self._port_cells.get(graphics_port)
+            if cell == previous_cell:
+                continue
+            if previous_cell is not None:
+                self._remove_from_cell(graphics_port, previous_cell)
+            self._port_cells[graphics_port] = cell
+            self._cells.setdefault(cell, set()).add(graphics_port)
+        self._dirty_ports.clear()
+
+    def nearest(
+        self,
+        position: QPointF,
+        radius: float,
+        predicate: Optional[Callable[[GraphicsPort], bool]] = None,
+    ) -> Optional[GraphicsPort]:
+        """Return the closest port accepted by the predicate, within the radius."""
+        self._flush()
+
+        cell_x, cell_y = self._cell(position)
+        cell_radius = max(1, ceil(radius / self._cell_size))
+        radius_squared = radius * radius
+
+        nearest_port = None
+        nearest_distance = radius_squared
+        for x in range(cell_x - cell_radius, cell_x + cell_radius + 1):
+            for y in range(cell_y - cell_radius, cell_y + cell_radius + 1):
+                for graphics_port in self._cells.get((x, y), ()):
+                    socket_position = graphics_port.scene_socket_position()
+                    dx = socket_position.x() - position.x()
+                    dy = socket_position.y() - position.y()
+                    distance = dx * dx + dy * dy
+                    if distance > nearest_distance:
+                        continue
+                    if predicate and not predicate(graphics_port):
+                        continue
+                    nearest_port = graphics_port
+                    nearest_distance = distance
+        return nearest_port
+
+    def size(self) -> int:
+        return len(self._port_cells.keys() | self._dirty_ports)
+
+
+__all__ = ["SocketIndex"]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Tuple
+
+import attr
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QFont, QStaticText, QTransform
+
+
+@attr.s
+class TextCache:
+    """Shared cache of the laid out texts the labels of the items are drawn with.
+
+    Many labels share the same text, like the ports of nodes of the same kind,
+    and are laid out and measured only once. Items keep a reference to their
+    static text and only query the cache again when their name changes.
+    """
+
+    _max_entries: int = attr.ib(default=10000)
+
+    # Least recently used first.
+    _entries: OrderedDict[Tuple[str, str], QStaticText] = attr.ib(
+        init=False, factory=OrderedDict
+    )
+
+    def static_text(self, text: str, font: QFont) -> QStaticText:
+        """Return the static text of the given text, laid out with the font."""
+        key = (text, font.key())
+        static_text = self._entries.get(key)
+        if static_text is not None:
+            self._entries.move_to_end(key)
+            return static_text
+
+        static_text = QStaticText(text)
+        static_text.setTextFormat(Qt.PlainText)
+        static_text.setPerformanceHint(QStaticText.AggressiveCaching)
+        static_text.prepare(QTransform(), font)
+
+        self._entries[key] = static_text
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return static_text
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+__all__ = ["TextCache"]
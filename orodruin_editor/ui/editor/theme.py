@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import attr
+from orodruin.core import PortTypes
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QBrush, QColor, QFont, QPen
+
+# Colors of the port types, by type name.
+PORT_TYPE_COLORS = {
+    "Reference": "#f0c674",
+    "Matrix3": "#cc6666",
+    "Matrix4": "#cc6666",
+    "Vector2": "#b5bd68",
+    "Vector3": "#b5bd68",
+    "Quaternion": "#b294bb",
+    "bool": "#de935f",
+    "float": "#8abeb7",
+    "int": "#81a2be",
+    "str": "#f0c674",
+}
+
+
+@attr.s(frozen=True)
+class PortStyle:
+    """Precomputed styling of a port type."""
+
+    color: QColor = attr.ib()
+    socket_brush: QBrush = attr.ib()
+    connection_pen: QPen = attr.ib()
+
+
+@attr.s
+class Theme:
+    """Colors, pens, brushes and fonts shared by all the graphics items.
+
+    Items reference these objects instead of allocating their own, they are
+    not meant to be modified in place. Use GraphicsState.set_theme instead.
+    """
+
+    port_type_colors: Dict[str, str] = attr.ib(factory=lambda: dict(PORT_TYPE_COLORS))
+    default_port_color: QColor = attr.ib(factory=lambda: QColor(Qt.lightGray))
+
+    node_header_brush: QBrush = attr.ib(factory=lambda: QBrush(QColor("#2B6299")))
+    node_background_brush: QBrush = attr.ib(factory=lambda: QBrush(QColor("#333333")))
+    node_selected_pen: QPen = attr.ib(factory=lambda: QPen(Qt.white, 5))
+
+    socket_pen: QPen = attr.ib(factory=lambda: QPen(QColor("#101010"), 2))
+
+    connection_width: int = attr.ib(default=2)
+    connection_selected_pen: QPen = attr.ib(factory=lambda: QPen(Qt.white, 2))
+
+    label_font: QFont = attr.ib(factory=lambda: QFont("Roboto", 10))
+    label_color: QColor = attr.ib(factory=lambda: QColor(Qt.white))
+
+    _port_styles: Dict[type, PortStyle] = attr.ib(init=False, factory=dict)
+    _default_port_style: PortStyle = attr.ib(init=False)
+
+    def __attrs_post_init__(self) -> None:
+        self._default_port_style = self._build_port_style(self.default_port_color)
+        for port_type in PortTypes:
+            self.port_style(port_type.value)
+
+    def _build_port_style(self, color: QColor) -> PortStyle:
+        return PortStyle(
+            color,
+            QBrush(color),
+            QPen(color, self.connection_width),
+        )
+
+    def port_style(self, port_type: type) -> PortStyle:
+        """Return the style of the given port type."""
+        port_style = self._port_styles.get(port_type)
+        if port_style is None:
+            color = self.port_type_colors.get(port_type.__name__)
+            if color is None:
+                port_style = self._default_port_style
+            else:
+                port_style = self._build_port_style(QColor(color))
+            self._port_styles[port_type] = port_style
+        return port_style
+
+
+__all__ = [
+    "PORT_TYPE_COLORS",
+    "PortStyle",
+    "Theme",
+]
@@ -1,33 +1,76 @@
-from typing import Optional
+import logging
+from typing import List, Optional
 
 import orodruin.commands
-from PySide2.QtCore import QModelIndex
-from PySide2.QtWidgets import QListView, QWidget
+from PySide2.QtCore import QModelIndex, Qt, Signal
+from PySide2.QtGui import QKeyEvent
+from PySide2.QtWidgets import QAbstractItemView, QListView, QWidget
+
+from orodruin_editor.core.tracing import do_command
 
 from .editor.graphics_state import GraphicsState
 
+logger = logging.getLogger(__name__)
+
 
 class NodeListView(QListView):
     """Node List View."""
 
+    # List of the NodeItems imported.
+    nodes_imported = Signal(object)
+
     def __init__(
         self, graphics_state: GraphicsState, parent: Optional[QWidget] = None
     ) -> None:
         super().__init__(parent=parent)
         self._graphics_state = graphics_state
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setUniformItemSizes(True)
         self.doubleClicked.connect(self.on_double_click_item)
 
     def on_double_click_item(self, index: Optional[QModelIndex] = None) -> None:
-        """Import the node double clicked node."""
+        """Import the double clicked node, or all the selected ones."""
         if not index:
             return
 
-        node = self.model().nodes()[index.row()]
+        if self.selectionModel().isSelected(index):
+            self.import_nodes(self.selectionModel().selectedRows())
+        else:
+            self.import_nodes([index])
+
+    def import_nodes(self, indexes: List[QModelIndex]) -> None:
+        """Import the nodes at the given indexes in a grid at the view center."""
+        rows = sorted({index.row() for index in indexes})
+        if not rows:
+            return
+
+        view = self._graphics_state.view()
+        center = view.mapToScene(view.viewport().rect().center())
+
+        with self._graphics_state.batch():
+            imported_nodes = []
+            used_nodes = []
+            for row in rows:
+                node = self.model().node(row)
+                command = orodruin.commands.ImportNode(
+                    self._graphics_state.state(),
+                    self._graphics_state.active_graph().uuid(),
+                    node.path.stem,
+                    node.library_name,
+                )
+                try:
+                    imported_nodes.append(do_command(command))
+                    used_nodes.append(node)
+                except Exception as e:
+                    logger.error(e)
+            self._graphics_state.arrange_nodes_in_grid(imported_nodes, center)
+
+        logger.debug("Imported %s nodes.", len(imported_nodes))
+        if used_nodes:
+            self.nodes_imported.emit(used_nodes)
 
-        command = orodruin.commands.ImportNode(
-            self._graphics_state.state(),
-            self._graphics_state.active_graph().uuid(),
-            node.path.stem,
-            node.library_name,
-        )
-        command.do()
+    def keyPressEvent(self, event: QKeyEvent) -> None:
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            self.import_nodes(self.selectionModel().selectedRows())
+        else:
+            super().keyPressEvent(event)
@@ -1,23 +1,33 @@
 import logging
+from pathlib import Path
 from typing import Optional
 
 import attr
 import orodruin.commands
 from orodruin.core import State
 from PySide2.QtCore import Qt
+from PySide2.QtGui import QCloseEvent
 from PySide2.QtWidgets import (
     QAction,
+    QActionGroup,
     QDockWidget,
+    QFileDialog,
+    QGraphicsView,
+    QHBoxLayout,
+    QLineEdit,
     QMainWindow,
     QMenuBar,
+    QProgressBar,
     QPushButton,
     QVBoxLayout,
     QWidget,
 )
 
+from orodruin_editor.core.tracing import Tracer, do_command
 from orodruin_editor.ui.editor.graphics_state import GraphicsState
 
 from ..models.node_list_model import NodeListModel
+from ..models.node_search_model import NodeSearchModel
 from .editor.graphics_items.graphics_node import GraphicsNode
 from .editor.graphics_view import GraphicsView
 from .node_list_view import NodeListView
@@ -29,6 +39,8 @@ logger = logging.getLogger(__name__)
 class OrodruinWindow(QMainWindow):
     _state: State = attr.ib()
     _parent: Optional[QWidget] = attr.ib(default=None)
+    # Defaults to the index in the user cache.
+    _library_index_path: Optional[Path] = attr.ib(default=None)
 
     _graphics_state: GraphicsState = attr.ib(init=False)
 
@@ -36,8 +48,17 @@ class OrodruinWindow(QMainWindow):
     _menu_bar: QMenuBar = attr.ib(init=False)
 
     _export_node_action: QAction = attr.ib(init=False)
+    _viewport_update_mode_group: QActionGroup = attr.ib(init=False)
+    _hud_action: QAction = attr.ib(init=False)
+    _export_paint_profile_action: QAction = attr.ib(init=False)
+    _trace_action: QAction = attr.ib(init=False)
+    _tracer: Tracer = attr.ib(init=False, factory=Tracer)
     _node_list_model: NodeListModel = attr.ib(init=False)
+    _node_search_model: NodeSearchModel = attr.ib(init=False)
+    _node_search_field: QLineEdit = attr.ib(init=False)
     _node_list_view: NodeListView = attr.ib(init=False)
+    _scan_progress_bar: QProgressBar = attr.ib(init=False)
+    _cancel_scan_button: QPushButton = attr.ib(init=False)
 
     def __attrs_post_init__(self) -> None:
         super().__init__(parent=self._parent)
@@ -55,6 +76,40 @@ class OrodruinWindow(QMainWindow):
         self._view = GraphicsView(self)
         self.setCentralWidget(self._view)
 
+        view_menu = self._menu_bar.addMenu("View")
+        viewport_update_menu = view_menu.addMenu("Viewport Update Mode")
+        self._viewport_update_mode_group = QActionGroup(self)
+        for label, mode in (
+            ("Full", QGraphicsView.FullViewportUpdate),
+            ("Minimal", QGraphicsView.MinimalViewportUpdate),
+            ("Smart", QGraphicsView.SmartViewportUpdate),
+            ("Bounding Rect", QGraphicsView.BoundingRectViewportUpdate),
+        ):
+            action = QAction(label, self._viewport_update_mode_group)
+            action.setCheckable(True)
+            action.setChecked(self._view.viewportUpdateMode() == mode)
+            action.triggered.connect(
+                lambda checked=False, mode=mode: self._view.set_viewport_update_mode(
+                    mode
+                )
+            )
+            viewport_update_menu.addAction(action)
+
+        self._hud_action = QAction("Frame Time HUD", self)
+        self._hud_action.setCheckable(True)
+        self._hud_action.setShortcut("F3")
+        self._hud_action.toggled.connect(self._view.set_hud_visible)
+        view_menu.addAction(self._hud_action)
+
+        self._export_paint_profile_action = QAction("Export Paint Profile...", self)
+        self._export_paint_profile_action.triggered.connect(self._export_paint_profile)
+        view_menu.addAction(self._export_paint_profile_action)
+
+        self._trace_action = QAction("Record Trace", self)
+        self._trace_action.setCheckable(True)
+        self._trace_action.toggled.connect(self._record_trace)
+        view_menu.addAction(self._trace_action)
+
         self._graphics_state = GraphicsState(self._state, self._view)
         self._view.set_graphics_state(self._graphics_state)
 
@@ -63,11 +118,36 @@ class OrodruinWindow(QMainWindow):
         self.addDockWidget(Qt.LeftDockWidgetArea, dock)
 
         node_list_layout = QVBoxLayout()
-        self._node_list_model = NodeListModel()
+        self._node_list_model = NodeListModel(
+            library_index_path=self._library_index_path
+        )
+        self._node_search_model = NodeSearchModel(self._node_list_model, self)
+
+        self._node_search_field = QLineEdit()
+        self._node_search_field.setPlaceholderText("Search nodes...")
+        self._node_search_field.setClearButtonEnabled(True)
+        self._node_search_field.textChanged.connect(self._node_search_model.set_query)
+        node_list_layout.addWidget(self._node_search_field)
+
         self._node_list_view = NodeListView(self._graphics_state, dock)
-        self._node_list_view.setModel(self._node_list_model)
+        self._node_list_view.setModel(self._node_search_model)
+        self._node_list_view.nodes_imported.connect(self._node_search_model.record_use)
         node_list_layout.addWidget(self._node_list_view)
 
+        scan_layout = QHBoxLayout()
+        self._scan_progress_bar = QProgressBar()
+        self._scan_progress_bar.setFormat("Scanning libraries %v/%m")
+        scan_layout.addWidget(self._scan_progress_bar)
+        self._cancel_scan_button = QPushButton("Cancel")
+        self._cancel_scan_button.clicked.connect(self._node_list_model.cancel_refresh)
+        scan_layout.addWidget(self._cancel_scan_button)
+        node_list_layout.addLayout(scan_layout)
+
+        self._node_list_model.scan_started.connect(lambda: self._show_scan(True))
+        self._node_list_model.scan_finished.connect(lambda: self._show_scan(False))
+        self._node_list_model.scan_progress.connect(self._update_scan_progress)
+        self._show_scan(self._node_list_model.is_scanning())
+
         refresh_button = QPushButton("Reload Node List")
         node_list_layout.addWidget(refresh_button)
         refresh_button.clicked.connect(self._node_list_model.refresh_nodes_list)
@@ -79,6 +159,48 @@ class OrodruinWindow(QMainWindow):
     def graphics_state(self) -> GraphicsState:
         return self._graphics_state
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self._node_list_model.cancel_refresh()
+        if not self._node_list_model.wait_for_scans(2000):
+            logger.warning("The library scan is still listing a library.")
+        super().closeEvent(event)
+
+    def _show_scan(self, visible: bool) -> None:
+        if visible:
+            # Busy indicator until the number of libraries is known.
+            self._scan_progress_bar.setRange(0, 0)
+        self._scan_progress_bar.setVisible(visible)
+        self._cancel_scan_button.setVisible(visible)
+
+    def _update_scan_progress(self, scanned: int, total: int) -> None:
+        self._scan_progress_bar.setRange(0, total)
+        self._scan_progress_bar.setValue(scanned)
+
+    def _export_paint_profile(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Paint Profile", "paint_profile.csv", "CSV (*.csv)"
+        )
+        if not path:
+            return
+        self._view.paint_profiler().export_csv(Path(path))
+        logger.info("Exported paint profile to %s.", path)
+
+    def _record_trace(self, record: bool) -> None:
+        """Start recording a trace, or stop and export the recorded one."""
+        if record:
+            self._tracer.clear()
+            self._tracer.start()
+            return
+
+        self._tracer.stop()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "orodruin_trace.json", "Chrome Trace (*.json)"
+        )
+        if not path:
+            return
+        self._tracer.export(Path(path))
+        logger.info("Exported %s trace events to %s.", len(self._tracer.events()), path)
+
     def _export_node(self):
         selection = self._view.scene().selectedItems()
         if not selection:
@@ -92,11 +214,13 @@ class OrodruinWindow(QMainWindow):
 
         orodruin_node = self._state.get_node(first_item.uuid())
 
-        orodruin.commands.ExportNode(
-            self._state,
-            orodruin_node,
-            "orodruin-library",
-            "orodruin",
-            orodruin_node.name(),
-        ).do()
-        self._node_list_model.refresh_nodes_list()
+        do_command(
+            orodruin.commands.ExportNode(
+                self._state,
+                orodruin_node,
+                "orodruin-library",
+                "orodruin",
+                orodruin_node.name(),
+            )
+        )
+        self._node_list_model.update_libraries(["orodruin-library"])